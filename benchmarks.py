@@ -0,0 +1,307 @@
+"""
+Benchmarks of the app's hot paths.
+
+Times, for each dataset, the stages a user waits for:
+
+    load        parsing an upload (job_data.parse_job_file)
+    aggregates  skill matrix and frequency tables of the visualization tabs
+    wordcloud   rendering the job title word cloud
+    embed       encoding the jobs' skill sets
+    index       building the job index (normalizing, and k-means when approximate)
+    topk        matching a batch of queries against the built index, with the
+                recall of the approximate index against a full scan
+
+Datasets are the two bundled CSV files plus synthetic ones of the requested
+sizes, generated from final_cleand_data (1).csv.  Each stage reports the best
+of --repeat runs and its peak Python memory (tracemalloc, measured in a
+separate run so it does not slow the timed ones).
+
+    python benchmarks.py --sizes 10000 100000 --output bench.json
+    python benchmarks.py --sizes 10000 100000 --baseline bench.json
+
+With --baseline, stages that got slower than the baseline by more than
+--tolerance are listed and the exit status is 1.  Without the MiniLM weights
+(or with --encoder stand-in) a hashing encoder stands in for the model, so
+the benchmarks also run offline; results record which encoder was used.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+from charts import word_cloud_png
+from job_data import parse_job_file
+from job_index import JobIndex
+from job_stats import build_aggregates
+from model_registry import registry, DEFAULT_MODEL_NAME
+from skill_encoding import encode_skill_sets
+from skill_vocab import SkillMatrix
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+BUNDLED_DATASETS = ['final_cleand_data (1).csv', 'Wuzzuf_Jobs.csv']
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+STAGES = ['load', 'aggregates', 'wordcloud', 'embed', 'index', 'topk']
+
+QUERIES = [
+    "python, sql, machine learning",
+    "customer service, english, call center",
+    "sales, negotiation, communication",
+    "java, spring, apis",
+    "accounting, excel, financial reporting",
+    "figma, ui/ux, prototyping",
+    "network security, cisco, vpn",
+    "marketing, social media, content writing",
+]
+
+# Timings below this many seconds are too noisy to call a regression
+NOISE_FLOOR = 0.05
+
+
+class HashingEncoder:
+    """
+    Offline stand-in for the sentence model: each skill is hashed to a fixed
+    random vector and a skill set is the sum of its skills' vectors.  It has
+    the model's encode() signature and output width, so the index and the
+    memory figures are comparable, but not its cost or quality.
+    """
+
+    def __init__(self, dim=384, buckets=1 << 15, seed=0):
+        self.dim = dim
+        self.buckets = buckets
+        self._table = np.random.default_rng(seed).standard_normal((buckets, dim)).astype(np.float32)
+
+    def encode(self, texts, batch_size=None, convert_to_numpy=True, show_progress_bar=False):
+        tokens = pd.Series(list(texts), dtype=object).str.split(',').explode()
+        rows = tokens.index.to_numpy()
+        values = tokens.fillna('').str.strip().to_numpy(dtype=object)
+        buckets = pd.util.hash_array(values) % self.buckets
+        weights = csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, buckets.astype(np.int64))),
+            shape=(len(texts), self.buckets)
+        )
+        return np.asarray(weights @ self._table, dtype=np.float32)
+
+
+def load_encoder(kind):
+    """(model, name) for --encoder: 'minilm', 'stand-in' or 'auto'."""
+    if kind in ('minilm', 'auto'):
+        try:
+            return registry.get(DEFAULT_MODEL_NAME), DEFAULT_MODEL_NAME
+        except (ImportError, OSError) as e:
+            if kind == 'minilm':
+                raise
+            print(f"MiniLM unavailable ({e.__class__.__name__}); using the hashing stand-in encoder",
+                  file=sys.stderr)
+    return HashingEncoder(), 'hashing-stand-in'
+
+
+def synthetic_dataset(rows, seed=0):
+    """
+    CSV bytes of a dataset with final_cleand_data's columns and rows rows.
+    Companies and title variants grow with the size and skill sets are
+    resampled from the real vocabulary, so distinct values scale like a
+    larger scrape would rather than repeating the same 429 postings.
+    """
+    rng = np.random.default_rng(seed)
+    with open(os.path.join(ROOT, BUNDLED_DATASETS[0]), 'rb') as f:
+        base = parse_job_file(BUNDLED_DATASETS[0], f.read())
+
+    sample = base.iloc[rng.integers(0, len(base), rows)].reset_index(drop=True)
+    companies = max(rows // 20, 1)
+    sample['Company'] = 'company ' + pd.Series(rng.integers(0, companies, rows)).astype(str)
+    sample['Title'] = sample['Title'].astype(str) + np.where(
+        rng.random(rows) < 0.3, ' ' + pd.Series(rng.integers(0, rows // 10 + 1, rows)).astype(str), ''
+    )
+
+    # Skill sets of 3-8 skills, drawn with the real skills' frequencies
+    counts = SkillMatrix.from_series(base['Skills']).counts()
+    vocabulary = counts.index.to_numpy(dtype=object)
+    frequencies = counts.to_numpy() / counts.sum()
+    sizes = rng.integers(3, 9, rows)
+    drawn = rng.choice(len(vocabulary), size=sizes.sum(), p=frequencies)
+    owners = np.repeat(np.arange(rows), sizes)
+    sample['Skills'] = pd.Series(vocabulary[drawn]).groupby(owners).agg(', '.join)
+
+    buffer = io.BytesIO()
+    sample.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+
+def _load(state):
+    state['job_data'] = parse_job_file(state['name'], state['content'])
+
+
+def _aggregates(state):
+    job_data = state['job_data']
+    state['aggregates'] = build_aggregates(job_data, SkillMatrix.from_series(job_data['Skills']))
+
+
+def _wordcloud(state):
+    text = state['aggregates']['title_text']
+    if text:
+        word_cloud_png(text)
+
+
+def _embed(state):
+    state['embeddings'], state['encode_stats'] = encode_skill_sets(state['model'], state['job_data']['Skills'])
+
+
+def _index(state):
+    state['index'] = JobIndex(state['embeddings'])
+
+
+def _topk(state):
+    queries = state['queries'] = state['model'].encode(
+        QUERIES * 8, batch_size=64, convert_to_numpy=True, show_progress_bar=False
+    )
+    state['index'].search(queries, k=5)
+
+
+STAGE_FUNCTIONS = {
+    'load': _load,
+    'aggregates': _aggregates,
+    'wordcloud': _wordcloud,
+    'embed': _embed,
+    'index': _index,
+    'topk': _topk,
+}
+
+# Stages whose output a later stage needs
+_REQUIRES = {'aggregates': 'load', 'wordcloud': 'aggregates', 'embed': 'load', 'index': 'embed', 'topk': 'index'}
+
+
+def _with_requirements(stages):
+    needed = set()
+    for stage in stages:
+        while stage is not None:
+            needed.add(stage)
+            stage = _REQUIRES.get(stage)
+    return [stage for stage in STAGES if stage in needed]
+
+
+def run_dataset(name, content, model, stages=STAGES, repeat=3, memory=True):
+    """{stage: {'seconds', 'peak_mb'}} for the requested stages of one dataset."""
+    state = {'name': name, 'content': content, 'model': model}
+    results = {}
+    for stage in _with_requirements(stages):
+        run = STAGE_FUNCTIONS[stage]
+        if stage not in stages:
+            # Only needed for its output
+            run(state)
+            continue
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run(state)
+            timings.append(time.perf_counter() - start)
+        result = {'seconds': min(timings)}
+
+        if memory:
+            tracemalloc.start()
+            try:
+                run(state)
+                result['peak_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+            finally:
+                tracemalloc.stop()
+
+        if stage == 'topk':
+            # Untimed: share of the exact top-k found (1.0 unless the index is approximate)
+            result['approximate'] = state['index'].approximate
+            result['recall'] = state['index'].recall(state['queries'], k=5)
+
+        results[stage] = result
+
+    results['rows'] = len(state['job_data'])
+    return results
+
+
+def compare(results, baseline, tolerance=0.25):
+    """Regressions of results against baseline, as readable strings."""
+    regressions = []
+    for dataset, stages in results['datasets'].items():
+        for stage, result in stages.items():
+            before = baseline.get('datasets', {}).get(dataset, {}).get(stage)
+            if not isinstance(result, dict) or not isinstance(before, dict):
+                continue
+            seconds, base_seconds = result['seconds'], before['seconds']
+            if seconds > base_seconds * (1 + tolerance) and seconds - base_seconds > NOISE_FLOOR:
+                regressions.append(f"{dataset} / {stage}: {base_seconds:.3f}s -> {seconds:.3f}s "
+                                   f"(+{(seconds / base_seconds - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the app's load, aggregate, render, embed, index and match paths.")
+    parser.add_argument('--sizes', type=int, nargs='*', default=DEFAULT_SIZES, help="synthetic dataset sizes")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per stage; the best is kept")
+    parser.add_argument('--encoder', choices=['auto', 'minilm', 'stand-in'], default='auto')
+    parser.add_argument('--no-memory', action='store_true', help="skip the peak memory runs")
+    parser.add_argument('--output', help="write the JSON results here instead of stdout")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown, e.g. 0.25 for 25%%")
+    args = parser.parse_args()
+
+    model, encoder_name = load_encoder(args.encoder)
+    datasets = []
+    for name in BUNDLED_DATASETS:
+        with open(os.path.join(ROOT, name), 'rb') as f:
+            datasets.append((name, name, f.read()))
+    for size in args.sizes:
+        datasets.append((f"synthetic-{size}", f"synthetic-{size}.csv", synthetic_dataset(size)))
+
+    results = {
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'encoder': encoder_name,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        },
+        'datasets': {},
+    }
+    for label, name, content in datasets:
+        print(f"Benchmarking {label}...", file=sys.stderr)
+        results['datasets'][label] = run_dataset(
+            name, content, model, args.stages, args.repeat, memory=not args.no_memory
+        )
+    # Linux reports kilobytes
+    results['environment']['max_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('environment', {}).get('encoder') != encoder_name:
+            print("Warning: the baseline used a different encoder", file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Small thread-safe LRU cache shared by the per-dataset caches of the app.
+"""
+import threading
+from collections import OrderedDict
+
+from tracing import tracer
+
+
+class LRUCache:
+    """
+    Keeps the most recently used max_entries values.  Values are built outside
+    the lock, so a slow build for one dataset does not block the others.
+    Hits and misses are also counted by the tracer under cache.<name>.
+    """
+
+    def __init__(self, max_entries=4, name=None):
+        self.max_entries = max_entries
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None."""
+        with self._lock:
+            value = self._values.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._values.move_to_end(key)
+        if self.name:
+            tracer.count(f"cache.{self.name}.{'misses' if value is None else 'hits'}")
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+            while len(self._values) > self.max_entries:
+                self._values.popitem(last=False)
+
+    def get_or_build(self, key, build):
+        value = self.get(key)
+        if value is None:
+            value = build()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._values), 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,133 @@
+"""
+Chart rendering for the visualization page.
+
+Charts are drawn on standalone matplotlib Figures (not registered with pyplot,
+so nothing accumulates across reruns), encoded once to PNG bytes, and cached
+by dataset, tab and number of items.  Plotly charts are cached as JSON.
+
+The plotting libraries take seconds to import (seaborn alone pulls in
+scipy.stats), so they are imported inside the functions that draw: pages
+without charts never pay for them, and warm_up_async() can load them in the
+background once the first page has been painted.
+"""
+import io
+import logging
+import threading
+
+from caching import LRUCache
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Same resolution st.pyplot renders figures at
+DPI = 200
+
+WORD_CLOUD_STOPWORDS = {'and', 'with', 'for', 'to', 'in', 'of', 'on', 'a', 'an', 'the'}
+
+
+def figure_png(fig):
+    buffer = io.BytesIO()
+    with tracer.span('chart.savefig'):
+        fig.savefig(buffer, format='png', dpi=DPI, bbox_inches='tight')
+    fig.clear()
+    return buffer.getvalue()
+
+
+def _import_backends():
+    import plotly.express
+    import plotly.io
+    import seaborn
+    import matplotlib.figure
+    import wordcloud
+
+
+def _import_backends_quietly():
+    try:
+        with tracer.span('import.charts'):
+            _import_backends()
+    except Exception:
+        # The page that draws will import again and surface the error
+        logger.exception("Background import of the plotting libraries failed")
+
+
+_warmer = None
+_warmer_lock = threading.Lock()
+
+
+def warm_up_async():
+    """Import the plotting libraries in a background thread, once per process."""
+    global _warmer
+    with _warmer_lock:
+        if _warmer is None:
+            _warmer = threading.Thread(target=_import_backends_quietly, name="warm-charts", daemon=True)
+            _warmer.start()
+    return _warmer
+
+
+def bar_chart_png(counts, palette, xlabel, ylabel, title):
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    sns.barplot(x=counts.values, y=counts.index, palette=palette, ax=ax)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    return figure_png(fig)
+
+
+def word_cloud_png(text):
+    from matplotlib.figure import Figure
+    from wordcloud import WordCloud
+
+    with tracer.span('wordcloud.generate'):
+        wordcloud = WordCloud(
+            width=1000, height=500, background_color='white',
+            stopwords=WORD_CLOUD_STOPWORDS,
+            colormap='magma', max_words=100
+        ).generate(text)
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    ax.imshow(wordcloud, interpolation='bilinear')
+    ax.axis('off')
+    ax.set_title('Most Common Words in Job Titles', fontsize=20)
+    return figure_png(fig)
+
+
+def pie_chart_png(counts, title):
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 8))
+    ax = fig.subplots()
+    ax.pie(
+        counts, labels=counts.index,
+        autopct='%1.1f%%', startangle=90,
+        colors=sns.color_palette('coolwarm', len(counts)),
+        explode=[0.1]*len(counts), shadow=True
+    )
+    ax.set_title(title, fontsize=14)
+    return figure_png(fig)
+
+
+def region_bar_json(top_regions_df, num_items):
+    import plotly.express as px
+
+    fig = px.bar(
+        top_regions_df, x='Region', y='Unique Companies',
+        title=f'Top {num_items} Regions by Unique Companies',
+        color='Unique Companies', text='Unique Companies'
+    )
+    with tracer.span('chart.plotly_json'):
+        return fig.to_json()
+
+
+def figure_from_json(data):
+    import plotly.io as pio
+
+    return pio.from_json(data)
+
+
+# Rendered charts keyed by (dataset key, chart, num_items), shared by every session
+figures = LRUCache(max_entries=64, name='figures')
@@ -0,0 +1,91 @@
+"""
+On-disk cache of job embeddings.
+
+Each uploaded dataset is identified by a hash of its raw bytes and the name of
+the model that encoded it.  The embeddings are stored as a float32 .npy matrix
+(one row per job) and loaded back memory-mapped, so re-uploading the same file
+or restarting the server does not re-encode anything.
+"""
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'WUZZUF_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.wuzzuf_cache')
+)
+
+
+def content_hash(content):
+    """Hex digest identifying the raw bytes of an uploaded file."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def file_content_hash(path):
+    """content_hash() of a file, read in blocks rather than all at once."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class EmbeddingStore:
+    def __init__(self, root=None):
+        self.root = os.path.join(root or DEFAULT_CACHE_DIR, 'embeddings')
+
+    def key(self, dataset_key, model_name):
+        """
+        Cache key for a dataset encoded with the given model.  dataset_key is
+        the content-hash key of the upload (see job_data.dataset_key).
+        """
+        return hashlib.sha256(f"{model_name}\0{dataset_key}".encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.root, f"{key}.npy")
+
+    def load(self, key, expected_rows=None):
+        """
+        Return the stored matrix memory-mapped read-only, or None if it is
+        missing, unreadable or does not have the expected number of rows.
+        """
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            matrix = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        if expected_rows is not None and matrix.shape[0] != expected_rows:
+            return None
+        return matrix
+
+    def save(self, key, matrix):
+        """Write the matrix atomically and return it memory-mapped from disk."""
+        os.makedirs(self.root, exist_ok=True)
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+
+        # Write to a temporary file first so readers never see a partial matrix
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.npy.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, matrix)
+            os.replace(tmp_path, self.path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return np.load(self.path(key), mmap_mode='r')
+
+    def get_or_build(self, key, build, expected_rows=None):
+        """Load the matrix for key, calling build() and storing it on a miss."""
+        matrix = self.load(key, expected_rows)
+        if matrix is None:
+            matrix = self.save(key, build())
+        return matrix
+
+
+# Shared by every session in this process
+store = EmbeddingStore()
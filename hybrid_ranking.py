@@ -0,0 +1,204 @@
+"""
+Hybrid lexical + semantic ranking with structured filters.
+
+Candidates are narrowed with inverted indexes before anything is scored:
+
+* facet indexes map each value of a categorical column (City, Region, Level,
+  YearsExp, ...) to the sorted rows holding it, so a filter is the union of a
+  few posting lists and filters on several columns are intersected;
+* the skill matrix maps each (lowercased) skill to the jobs listing it, so
+  only jobs sharing at least one skill with the query are kept when there
+  are any.
+
+The survivors alone are scored with a blend of exact skill overlap (BM25 or
+Jaccard) and cosine similarity of the embeddings, and returned a page at a
+time.
+"""
+import numpy as np
+import pandas as pd
+
+from caching import LRUCache
+from skill_vocab import SEPARATOR, SkillMatrix, normalize_skill_column
+
+FILTER_COLUMNS = ['City', 'Region', 'Country', 'Level', 'YearsExp', 'Type']
+
+# Candidates are scored a block of gathered vectors at a time, so a large
+# candidate set is never copied whole; past this fraction of the rows it is
+# cheaper to score every row in place and pick the candidates' scores
+_FULL_SCAN_FRACTION = 0.5
+_GATHER_BLOCK_ROWS = 2048
+
+# BM25 parameters; skills are a set, so term frequency is always 1
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def _facet_keys(values):
+    return values.astype(object).where(values.notna(), '').astype(str).str.strip()
+
+
+class FacetIndex:
+    """Inverted index of one categorical column: value -> sorted row ids."""
+
+    def __init__(self, values):
+        labels = _facet_keys(values)
+        codes, keys = pd.factorize(labels.str.lower())
+        self.keys = pd.Index(keys)
+        order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes, minlength=len(keys))
+        self._ptr = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self._ptr[1:])
+        self._rows = order
+
+        # Shown with the spelling of their first occurrence, most common first
+        first = np.unique(codes, return_index=True)[1]
+        self.labels = pd.Series(labels.to_numpy()[first], index=self.keys)
+        self._counts = pd.Series(counts, index=self.keys)
+
+    def options(self):
+        """Non-blank values, most frequent first."""
+        counts = self._counts.drop('', errors='ignore').sort_values(ascending=False, kind='stable')
+        return list(self.labels[counts.index])
+
+    def rows(self, values):
+        """Sorted row ids holding any of the values (compared case-insensitively)."""
+        codes = self.keys.get_indexer([str(v).strip().lower() for v in values])
+        codes = codes[codes >= 0]
+        if not len(codes):
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate([self._rows[self._ptr[c]:self._ptr[c + 1]] for c in codes]))
+
+
+def filter_options(job_data, columns=FILTER_COLUMNS):
+    """{column: values} offered as filters for the columns the dataset has."""
+    return {column: FacetIndex(job_data[column]).options() for column in columns if column in job_data.columns}
+
+
+def query_skills(user_skills):
+    """Lowercased, deduplicated skill tokens of a comma-separated query."""
+    text = normalize_skill_column(pd.Series([user_skills], dtype=object)).iloc[0].lower()
+    return list(dict.fromkeys(s for s in text.split(SEPARATOR) if s))
+
+
+class HybridRanker:
+    """
+    Filtered, blended ranking over one dataset.  vectors are the
+    L2-normalized job embeddings (JobIndex.vectors), row-aligned with
+    job_data.  When index is an approximate JobIndex, queries that neither
+    filters nor skills narrow down only rank the jobs of its closest clusters.
+    """
+
+    def __init__(self, job_data, vectors, filter_columns=FILTER_COLUMNS, index=None):
+        self.vectors = vectors
+        self.index = index
+        self.facets = {c: FacetIndex(job_data[c]) for c in filter_columns if c in job_data.columns}
+        self.skills = SkillMatrix.from_series(job_data['Skills'].fillna('').astype(str).str.lower())
+
+        lengths = np.diff(self.skills.indptr)
+        document_frequency = np.bincount(self.skills.indices, minlength=self.skills.n_skills)
+        n_jobs = max(self.skills.n_jobs, 1)
+        self._idf = np.log1p((n_jobs - document_frequency + 0.5) / (document_frequency + 0.5))
+        self._lengths = lengths
+        # BM25 term weight of a matching skill in each job (tf = 1)
+        average = lengths.mean() if len(lengths) and lengths.mean() > 0 else 1.0
+        self._bm25_norm = (BM25_K1 + 1) / (1 + BM25_K1 * (1 - BM25_B + BM25_B * lengths / average))
+
+    def candidates(self, filters=None):
+        """Sorted rows passing every filter ({column: values}), or None for all rows."""
+        rows = None
+        for column, values in (filters or {}).items():
+            if column not in self.facets or not values:
+                continue
+            matching = self.facets[column].rows(values)
+            rows = matching if rows is None else np.intersect1d(rows, matching, assume_unique=True)
+        return rows
+
+    def _similarity(self, rows, query_vector):
+        if rows is None:
+            return self.vectors @ query_vector
+        if len(rows) >= _FULL_SCAN_FRACTION * len(self.vectors):
+            return (self.vectors @ query_vector)[rows]
+        similarity = np.empty(len(rows), dtype=np.float32)
+        for start in range(0, len(rows), _GATHER_BLOCK_ROWS):
+            block = rows[start:start + _GATHER_BLOCK_ROWS]
+            similarity[start:start + len(block)] = self.vectors[block] @ query_vector
+        return similarity
+
+    def _skill_postings(self, codes):
+        """Concatenated rows of the jobs listing each code, and the code of each entry."""
+        postings = [self.skills.jobs_with(c) for c in codes]
+        rows = np.concatenate(postings) if postings else np.empty(0, dtype=np.int64)
+        return rows, np.repeat(codes, [len(p) for p in postings])
+
+    def rank(self, query_vector, user_skills, filters=None, k=10, page=0,
+             lexical_weight=0.3, lexical='bm25', require_skill_match=True):
+        """
+        One page of results: (rows, scores, total) where scores holds the
+        'similarity', 'skill_match' and 'score' arrays of the page's rows
+        and total is the number of candidates ranked.
+        """
+        query_vector = np.asarray(query_vector, dtype=np.float32).ravel()
+        query_vector = query_vector / (np.linalg.norm(query_vector) or 1.0)
+
+        rows = self.candidates(filters)
+        tokens = query_skills(user_skills)
+        codes = self.skills.codes_for(tokens)
+        posting_rows, posting_codes = self._skill_postings(codes)
+
+        if require_skill_match and len(posting_rows):
+            # A row mask sorts and deduplicates the postings in one O(rows) pass
+            skilled = np.zeros(len(self.vectors), dtype=bool)
+            skilled[posting_rows] = True
+            skilled = np.flatnonzero(skilled)
+            narrowed = skilled if rows is None else np.intersect1d(rows, skilled, assume_unique=True)
+            # Fall back to the filtered jobs when none of them shares a skill
+            if len(narrowed):
+                rows = narrowed
+        if rows is None and self.index is not None:
+            probed = self.index.candidate_rows(query_vector)
+            if probed is not None and len(probed) >= (page + 1) * k:
+                rows = probed
+        similarity = self._similarity(rows, query_vector)
+        if rows is None:
+            rows = np.arange(len(self.vectors))
+
+        # Exact skill overlap of each candidate, accumulated from the postings
+        lexical_scores = np.zeros(len(rows))
+        if len(posting_rows) and len(rows):
+            positions = np.searchsorted(rows, posting_rows)
+            positions = np.minimum(positions, len(rows) - 1)
+            hit = rows[positions] == posting_rows
+            positions, hit_codes = positions[hit], posting_codes[hit]
+            if lexical == 'jaccard':
+                overlap = np.bincount(positions, minlength=len(rows))
+                union = len(tokens) + self._lengths[rows] - overlap
+                lexical_scores = np.divide(overlap, union, out=np.zeros(len(rows)), where=union > 0)
+            else:
+                weights = self._idf[hit_codes] * self._bm25_norm[rows[positions]]
+                lexical_scores = np.bincount(positions, weights=weights, minlength=len(rows))
+                if lexical_scores.max() > 0:
+                    lexical_scores = lexical_scores / lexical_scores.max()
+
+        score = (1 - lexical_weight) * similarity + lexical_weight * lexical_scores
+
+        # Partial sort of the candidates needed up to the end of the page.  Every
+        # candidate tied with the last one is kept and ties are broken by row, so
+        # consecutive pages never repeat or skip a job.
+        end = min((page + 1) * k, len(rows))
+        start = min(page * k, end)
+        if end < len(rows):
+            boundary = -np.partition(-score, end - 1)[end - 1]
+            top = np.flatnonzero(score >= boundary)
+        else:
+            top = np.arange(len(rows))
+        top = top[np.lexsort((rows[top], -score[top]))][start:end]
+
+        return rows[top], {
+            'similarity': similarity[top],
+            'skill_match': lexical_scores[top],
+            'score': score[top],
+        }, len(rows)
+
+
+# Filter options of the most recently used datasets, shared by every session
+filter_options_cache = LRUCache(max_entries=8, name='filter_options')
@@ -0,0 +1,190 @@
+"""
+Vectorized cleaning of raw and scraped job data.
+
+The notebook cleaned one row at a time: clean_text() and clean_skills() ran
+re.sub through Series.apply and split_location() built a new Series for every
+row.  The same steps are done here with column-wide .str operations on
+precompiled patterns:
+
+* Title and Company are lowercased with punctuation removed,
+* Skills are lowercased, stripped of punctuation other than commas and
+  deduplicated within each job (first occurrence kept),
+* Location is split into Region, City and Country.
+
+Both inputs are understood: scraped listings (wuzzuf_scraper.py) whose
+Location reads "region, city, country", and the raw Wuzzuf_Jobs.csv where
+Location holds the area and Country the governorate (or the country for
+postings abroad).
+
+clean_file() streams a CSV in chunks, so files larger than memory can be
+cleaned:
+
+    python job_cleaning.py final_Data.csv final_cleand_data.csv
+"""
+import argparse
+import os
+import re
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from skill_vocab import SEPARATOR, normalize_skill_column
+
+TEXT_COLUMNS = ['Title', 'Company']
+LOCATION_COLUMNS = ['Region', 'City', 'Country']
+NO_REGION = 'No Region'
+
+# Rows read and cleaned at a time by clean_file
+DEFAULT_CHUNK_ROWS = 100_000
+
+# Governorates as Wuzzuf spells them; the raw dataset leaves out the country
+# of postings located in one of these
+EGYPT_GOVERNORATES = frozenset([
+    'alexandria', 'aswan', 'assiut', 'beheira', 'beni suef', 'cairo', 'dakahlia',
+    'damietta', 'fayoum', 'gharbia', 'giza', 'ismailia', 'kafr el sheikh', 'luxor',
+    'matruh', 'minya', 'monufya', 'new valley', 'north sinai', 'port said', 'qalubia',
+    'qena', 'red sea', 'sharqia', 'sohag', 'south sinai', 'suez',
+])
+
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+_SKILL_PUNCTUATION_RE = re.compile(r'[^\w\s,]')
+_WHITESPACE_RE = re.compile(r'\s+')
+# A run of commas together with the whitespace around them
+_PART_SEPARATOR_RE = re.compile(r'\s*(?:,\s*)+')
+
+
+def clean_text(values):
+    """The notebook's clean_text(): lowercased, punctuation removed, stripped."""
+    values = values.fillna('').astype(str).str.lower()
+    return values.str.replace(_PUNCTUATION_RE, '', regex=True).str.strip()
+
+
+def _drop_repeated_skills(skills):
+    # Only the rows that repeat a skill are rebuilt; the rest are kept as they are
+    non_empty = (skills != '').to_numpy()
+    tokens_per_row = np.where(non_empty, skills.str.count(SEPARATOR) + 1, 0)
+    tokens = SEPARATOR.join(skills[non_empty]).split(SEPARATOR) if non_empty.any() else []
+    rows = np.repeat(np.arange(len(skills), dtype=np.int64), tokens_per_row)
+
+    repeated = pd.DataFrame({'row': rows, 'token': tokens}).duplicated().to_numpy()
+    if not repeated.any():
+        return skills
+    keep = ~repeated & np.isin(rows, rows[repeated])
+    rebuilt = pd.Series(np.asarray(tokens, dtype=object)[keep]).groupby(rows[keep]).agg(SEPARATOR.join)
+
+    result = skills.to_numpy(dtype=object, copy=True)
+    result[rebuilt.index.to_numpy()] = rebuilt.to_numpy()
+    return pd.Series(result, index=skills.index, name=skills.name)
+
+
+def clean_skills(skills):
+    """
+    The notebook's clean_skills(): lowercased skill lists without punctuation
+    other than the commas, each skill listed once.  Skills keep the order they
+    are first listed in rather than the arbitrary order of a set.
+    """
+    skills = skills.fillna('').astype(str).str.lower()
+    skills = skills.str.replace(_SKILL_PUNCTUATION_RE, '', regex=True)
+    skills = normalize_skill_column(skills.str.replace(_WHITESPACE_RE, ' ', regex=True))
+    return _drop_repeated_skills(skills)
+
+
+def location_text(job_data):
+    """
+    Comma-separated "region, city, country" text of each posting.  The raw
+    dataset's Location and Country columns are joined, with Egypt added after
+    a governorate.
+    """
+    location = job_data['Location'].fillna('').astype(str).str.strip()
+    if 'Country' not in job_data.columns:
+        return location
+    country = job_data['Country'].fillna('').astype(str).str.strip()
+    egyptian = country.str.lower().isin(EGYPT_GOVERNORATES).to_numpy()
+    suffix = pd.Series(np.where(egyptian, ', Egypt', ''), index=job_data.index)
+    return location + ', ' + country + suffix
+
+
+def split_location(locations):
+    """
+    The notebook's split_location() for a whole column: a DataFrame of
+    Region, City and Country.  The last part is the country, the one before
+    it the city and anything earlier the region; a location with fewer than
+    three parts has no region, and one with fewer than two has none of them.
+
+    Parts are separated by commas, or by whitespace in text without commas
+    (already cleaned locations), so multi-word cities such as "red sea" stay
+    whole when the commas are there.
+    """
+    text = locations.fillna('').astype(str).str.strip()
+    spaced = text.str.replace(_WHITESPACE_RE, ', ', regex=True)
+    text = text.where(text.str.contains(',', regex=False), spaced)
+    text = text.str.replace(_PART_SEPARATOR_RE, SEPARATOR, regex=True).str.strip().str.strip(',').str.strip()
+
+    n_parts = np.where(text != '', text.str.count(SEPARATOR) + 1, 0)
+    parts = text.str.rsplit(SEPARATOR, n=2, expand=True).reindex(columns=range(3))
+    parts = [clean_text(parts[column]).to_numpy(dtype=object) for column in range(3)]
+
+    three, two = n_parts >= 3, n_parts == 2
+    return pd.DataFrame({
+        'Region': np.where(three, parts[0], NO_REGION),
+        'City': np.where(three, parts[1], np.where(two, parts[0], NO_REGION)),
+        'Country': np.where(three, parts[2], np.where(two, parts[1], NO_REGION)),
+    }, index=locations.index)
+
+
+def clean_jobs(job_data):
+    """
+    Cleaned copy of raw or scraped job data.  Location (and the raw Country
+    column) is replaced by Region, City and Country; other columns are kept.
+    """
+    job_data = job_data.copy()
+    for column in TEXT_COLUMNS:
+        if column in job_data.columns:
+            job_data[column] = clean_text(job_data[column])
+    if 'Skills' in job_data.columns:
+        job_data['Skills'] = clean_skills(job_data['Skills'])
+    if 'Location' in job_data.columns:
+        locations = split_location(location_text(job_data))
+        job_data = job_data.drop(columns=['Location', 'Country'], errors='ignore')
+        for column in LOCATION_COLUMNS:
+            job_data[column] = locations[column]
+    return job_data
+
+
+def clean_file(input_path, output_path, chunksize=DEFAULT_CHUNK_ROWS):
+    """
+    Clean a CSV chunk by chunk into output_path (UTF-8 with BOM, like the
+    notebook's final_cleand_data.csv) and return the number of rows.  The
+    output is written to a temporary file and moved into place when done.
+    """
+    reader = pd.read_csv(input_path, chunksize=chunksize, dtype=str, encoding='utf-8-sig')
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.csv.tmp')
+    rows = 0
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8-sig', newline='') as f:
+            for i, chunk in enumerate(reader):
+                cleaned = clean_jobs(chunk)
+                cleaned.to_csv(f, index=False, header=i == 0)
+                rows += len(cleaned)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean raw or scraped Wuzzuf job data.")
+    parser.add_argument('input', help="CSV with Title, Company, Skills and Location columns")
+    parser.add_argument('output', help="cleaned CSV to write")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNK_ROWS, help="rows cleaned at a time")
+    args = parser.parse_args()
+
+    rows = clean_file(args.input, args.output, args.chunksize)
+    print(f"Cleaned {rows} jobs into {args.output}")
+
+
+if __name__ == '__main__':
+    main()
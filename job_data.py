@@ -0,0 +1,81 @@
+"""
+Parsing of uploaded job data files, with a process-wide cache.
+
+Streamlit reruns the page script on every widget interaction (each move of the
+visualization slider, for example).  Parsing is keyed by a hash of the file
+contents so that those reruns, and other sessions uploading the same file,
+reuse the already prepared DataFrame instead of re-reading the upload.
+"""
+import io
+
+import pandas as pd
+
+from caching import LRUCache
+from embedding_store import content_hash, store as embedding_store
+from job_store import COLUMNAR_EXTENSIONS, read_job_table
+from skill_vocab import normalize_skill_column
+from tracing import tracer
+
+
+class JobDataError(ValueError):
+    """The uploaded file cannot be used as job data."""
+
+
+def parse_job_file(name, content, key=None):
+    """
+    Read a CSV, XLSX or columnar (Arrow/Parquet, see job_store) upload into a
+    DataFrame with 'Skills' normalized to canonical "skill, skill" strings.
+    Embeddings stored in a columnar file are saved to the embedding store
+    under key, so the recommender does not have to encode the jobs again.
+    Raises JobDataError for files the app cannot use.
+    """
+    if name.endswith('.csv'):
+        job_data = pd.read_csv(io.BytesIO(content))
+    elif name.endswith('.xlsx'):
+        job_data = pd.read_excel(io.BytesIO(content))
+    elif name.endswith(COLUMNAR_EXTENSIONS):
+        try:
+            job_data, embeddings, info = read_job_table(content, name)
+        except (OSError, ValueError) as e:
+            raise JobDataError(f"The uploaded file is not a valid Arrow/Parquet file: {e}")
+        if embeddings is not None and key is not None and len(embeddings) == len(job_data):
+            embedding_store.save(embedding_store.key(key, info['model_name']), embeddings)
+    else:
+        raise JobDataError("Unsupported file format. Please upload a CSV, XLSX, Arrow or Parquet file.")
+
+    if 'Skills' not in job_data.columns:
+        raise JobDataError("The uploaded file must contain a 'Skills' column.")
+
+    if job_data.empty:
+        raise JobDataError("The uploaded file is empty.")
+
+    job_data['Skills'] = normalize_skill_column(job_data['Skills'])
+    return job_data
+
+
+def dataset_key(name, content):
+    """Cache key for an upload: its content hash plus the extension that decides how it is parsed."""
+    extension = name[name.rfind('.'):] if '.' in name else ''
+    return f"{content_hash(content)}{extension}"
+
+
+class DatasetCache(LRUCache):
+    """
+    LRU cache of prepared job DataFrames keyed by dataset_key().
+
+    load() hands out shallow copies: callers may add columns freely, but must
+    not modify the shared values in place.
+    """
+
+    def load(self, name, content, key=None):
+        key = key or dataset_key(name, content)
+        def build():
+            with tracer.span('parse_job_file'):
+                return parse_job_file(name, content, key)
+
+        job_data = self.get_or_build(key, build)
+        return job_data.copy(deep=False)
+
+
+# Shared by every session in this process
+datasets = DatasetCache(max_entries=8, name='datasets')
@@ -0,0 +1,176 @@
+"""
+Vector index over job embeddings.
+
+The embeddings are L2-normalized once into a contiguous float32 matrix, so a
+query is a single matrix-vector product followed by an argpartition top-k
+instead of a cosine_similarity call plus a full sort of the DataFrame.
+
+For very large datasets (aggregated scrapes over many search terms) the index
+can also run in an approximate IVF mode: jobs are clustered with spherical
+k-means and a query only scores the jobs in its n_probe closest clusters.
+"""
+import numpy as np
+
+from caching import LRUCache
+
+# Datasets at least this large use the approximate mode by default
+APPROXIMATE_MIN_ROWS = 200_000
+
+# Rows scored per block when assigning jobs to clusters, to bound memory
+_ASSIGN_CHUNK_ROWS = 65_536
+
+
+def _normalize_rows(matrix):
+    matrix = np.array(matrix, dtype=np.float32, copy=True, ndmin=2)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return np.ascontiguousarray(matrix)
+
+
+def _top_k(scores, k):
+    """Indices and values of the k largest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    order = candidates[np.argsort(-scores[candidates], kind='stable')]
+    return order, scores[order]
+
+
+class JobIndex:
+    """
+    Cosine-similarity index over one dataset's job embeddings.
+
+    approximate=None picks the IVF mode automatically for datasets with at
+    least APPROXIMATE_MIN_ROWS jobs.  n_lists defaults to about sqrt(rows)
+    clusters and n_probe controls the recall/speed trade-off.
+    """
+
+    def __init__(self, embeddings, approximate=None, n_lists=None, n_probe=8, seed=0):
+        self.vectors = _normalize_rows(embeddings)
+        if approximate is None:
+            approximate = len(self.vectors) >= APPROXIMATE_MIN_ROWS
+        self.approximate = approximate
+        self.n_probe = n_probe
+        if approximate:
+            self._build_ivf(n_lists or int(np.sqrt(len(self.vectors))), seed)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def _assign(self, vectors):
+        # Closest centroid for every row, computed in blocks
+        labels = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), _ASSIGN_CHUNK_ROWS):
+            block = vectors[start:start + _ASSIGN_CHUNK_ROWS]
+            labels[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+        return labels
+
+    def _build_ivf(self, n_lists, seed, iterations=10, sample_per_list=256):
+        n = len(self.vectors)
+        n_lists = max(1, min(n_lists, n))
+        rng = np.random.default_rng(seed)
+
+        # Spherical k-means on a sample is enough to place the centroids
+        sample_size = min(n, n_lists * sample_per_list)
+        sample = self.vectors[rng.choice(n, sample_size, replace=False)]
+        self.centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            labels = self._assign(sample)
+            sums = np.zeros_like(self.centroids)
+            np.add.at(sums, labels, sample)
+            empty = ~sums.any(axis=1)
+            sums[empty] = self.centroids[empty]
+            self.centroids = _normalize_rows(sums)
+
+        self._set_lists(self._assign(self.vectors))
+
+    def _set_lists(self, labels):
+        # Inverted lists stored as one permutation plus offsets
+        self._labels = labels
+        self._list_members = np.argsort(labels, kind='stable')
+        self._list_offsets = np.concatenate(([0], np.cumsum(np.bincount(labels, minlength=len(self.centroids)))))
+
+    def with_rows(self, keep, added):
+        """
+        New index holding the rows keep of this one followed by the added
+        embeddings.  An approximate index keeps its centroids and only assigns
+        the added rows, so updating it does not re-run k-means.
+        """
+        index = JobIndex.__new__(JobIndex)
+        index.approximate = self.approximate
+        index.n_probe = self.n_probe
+        kept = self.vectors[np.asarray(keep, dtype=np.int64)]
+        added = _normalize_rows(added) if len(added) else np.empty((0, kept.shape[1]), dtype=np.float32)
+        index.vectors = np.ascontiguousarray(np.concatenate([kept, added]))
+        if self.approximate:
+            index.centroids = self.centroids
+            index._set_lists(np.concatenate([self._labels[keep], index._assign(added)]))
+        return index
+
+    def _candidates(self, query, n_probe):
+        probes = _top_k(self.centroids @ query, n_probe)[0]
+        return np.concatenate([
+            self._list_members[self._list_offsets[p]:self._list_offsets[p + 1]] for p in probes
+        ])
+
+    def candidate_rows(self, query, n_probe=None):
+        """
+        Sorted rows of the n_probe clusters closest to a normalized query, or
+        None for an exact index, which has no clusters to narrow the scan.
+        """
+        if not self.approximate:
+            return None
+        return np.sort(self._candidates(query, n_probe or self.n_probe))
+
+    def _search_one(self, query, k, exact, n_probe):
+        if not exact and self.approximate:
+            candidates = self._candidates(query, n_probe)
+            if len(candidates) >= k:
+                local, scores = _top_k(self.vectors[candidates] @ query, k)
+                return candidates[local], scores
+        return _top_k(self.vectors @ query, k)
+
+    def search(self, queries, k=5, exact=False, n_probe=None):
+        """
+        Top-k jobs for one query vector or a batch of them.
+
+        Returns (indices, scores): 1-D arrays for a single query, or arrays of
+        shape (n_queries, k) for a batch.  exact=True forces a full scan.
+        """
+        single = np.ndim(queries) == 1
+        queries = _normalize_rows(queries)
+        k = min(k, len(self.vectors))
+        n_probe = n_probe or self.n_probe
+
+        if exact or not self.approximate:
+            scores = queries @ self.vectors.T
+            results = [_top_k(row, k) for row in scores]
+        else:
+            results = [self._search_one(q, k, exact, n_probe) for q in queries]
+
+        indices = np.array([r[0] for r in results], dtype=np.int64).reshape(len(queries), k)
+        scores = np.array([r[1] for r in results], dtype=np.float32).reshape(len(queries), k)
+        if single:
+            return indices[0], scores[0]
+        return indices, scores
+
+    def recall(self, queries, k=5, n_probe=None):
+        """
+        Fraction of the exact top-k that the approximate search returns, used
+        to check an IVF index against a full scan before relying on it.
+        """
+        exact_ids, _ = self.search(queries, k, exact=True)
+        approx_ids, _ = self.search(queries, k, n_probe=n_probe)
+        exact_ids = np.atleast_2d(exact_ids)
+        approx_ids = np.atleast_2d(approx_ids)
+        hits = sum(len(np.intersect1d(e, a)) for e, a in zip(exact_ids, approx_ids))
+        return hits / exact_ids.size if exact_ids.size else 1.0
+
+
+# Indexes of the most recently used datasets, shared by every session
+indexes = LRUCache(max_entries=4, name='job_indexes')
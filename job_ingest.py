@@ -0,0 +1,244 @@
+"""
+Incremental ingestion of daily job scrapes.
+
+A live dataset is kept on disk together with its normalized embeddings,
+skill matrix and frequency tables.  Each new snapshot (e.g. today's scrape) is
+compared with it by a (Title, Company, City) fingerprint:
+
+* postings seen before with identical content are kept as they are,
+* new postings, and postings whose other columns changed, are embedded and
+  appended,
+* postings missing from the snapshot have expired and are dropped.
+
+Only the added rows are encoded and the index, skill matrix and frequency
+tables are adjusted by the change, so a daily refresh costs time proportional
+to the number of changed postings rather than the size of the dataset.
+"""
+import logging
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from embedding_store import DEFAULT_CACHE_DIR, store as embedding_store
+from job_data import datasets as dataset_cache
+from job_index import JobIndex, indexes as job_indexes
+from job_stats import aggregates_cache, build_aggregates, update_aggregates
+from model_registry import DEFAULT_MODEL_NAME
+from skill_encoding import encode_skill_sets
+from skill_vocab import SkillMatrix, skill_matrices
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_COLUMNS = ['Title', 'Company', 'City']
+
+
+def fingerprints(job_data):
+    """Normalized Title|Company|City identity of each posting."""
+    parts = [
+        job_data[column].fillna('').astype(str).str.strip().str.lower()
+        if column in job_data.columns else pd.Series('', index=job_data.index)
+        for column in FINGERPRINT_COLUMNS
+    ]
+    return parts[0].str.cat(parts[1:], sep='\x1f')
+
+
+def content_signatures(job_data):
+    """Hash of each posting's full contents, to detect changed postings."""
+    return pd.util.hash_pandas_object(job_data, index=False).to_numpy()
+
+
+class IncrementalDataset:
+    """
+    A job dataset maintained across snapshots and persisted under root.
+    key identifies the current version for the app's per-dataset caches.
+    """
+
+    def __init__(self, root=None, model_name=DEFAULT_MODEL_NAME):
+        self.root = root or os.path.join(DEFAULT_CACHE_DIR, 'live')
+        self.model_name = model_name
+        self.version = 0
+        self.job_data = None
+        self.index = None
+        self.skill_matrix = None
+        self.aggregates = None
+        self._fingerprints = None
+        self._signatures = None
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    @property
+    def key(self):
+        self._ensure_loaded()
+        return f"live-{self.version}" if self.job_data is not None else None
+
+    def _state_path(self):
+        return os.path.join(self.root, 'state.pkl')
+
+    def _embeddings_name(self, version):
+        # One file per version, so the state always names the embeddings it was saved with
+        return f'embeddings-{version}.npy'
+
+    def _ensure_loaded(self):
+        # Read lazily so importing the module never touches the disk
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+
+    def _load(self):
+        if not os.path.exists(self._state_path()):
+            return
+        state = pd.read_pickle(self._state_path())
+        if state['model_name'] != self.model_name:
+            return
+        # States written before the embeddings were versioned name no file
+        embeddings_path = os.path.join(self.root, state.get('embeddings_file', 'embeddings.npy'))
+        embeddings = np.load(embeddings_path) if os.path.exists(embeddings_path) else None
+        if embeddings is None or len(embeddings) != len(state['job_data']):
+            logger.warning("Ignoring the live dataset in %s: its embeddings do not match its %d jobs",
+                           self.root, len(state['job_data']))
+            return
+        self.version = state['version']
+        self.job_data = state['job_data']
+        self.skill_matrix = state['skill_matrix']
+        self.aggregates = state['aggregates']
+        self._fingerprints = state['fingerprints']
+        self._signatures = state['signatures']
+        self.index = JobIndex(embeddings)
+
+    def _save(self):
+        os.makedirs(self.root, exist_ok=True)
+
+        # The embeddings of this version go to their own file first and the
+        # state, replaced atomically, names it, so a crash in between leaves
+        # the previous state with its own embeddings
+        embeddings_file = self._embeddings_name(self.version)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, self.index.vectors)
+        os.replace(tmp_path, os.path.join(self.root, embeddings_file))
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        os.close(fd)
+        pd.to_pickle({
+            'version': self.version,
+            'model_name': self.model_name,
+            'job_data': self.job_data,
+            'skill_matrix': self.skill_matrix,
+            'aggregates': self.aggregates,
+            'fingerprints': self._fingerprints,
+            'signatures': self._signatures,
+            'embeddings_file': embeddings_file,
+        }, tmp_path)
+        os.replace(tmp_path, self._state_path())
+
+        # Embeddings of earlier versions are no longer referenced
+        for name in os.listdir(self.root):
+            if name.startswith('embeddings') and name.endswith('.npy') and name != embeddings_file:
+                os.remove(os.path.join(self.root, name))
+
+    def ingest(self, snapshot, model, drop_missing=True):
+        """
+        Merge a prepared snapshot (see job_data.parse_job_file) into the
+        dataset and return a report of what changed.  With drop_missing=False
+        the snapshot is treated as an addition and nothing expires.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            snapshot = snapshot.reset_index(drop=True)
+            snapshot_prints = fingerprints(snapshot)
+            latest = ~snapshot_prints.duplicated(keep='last').to_numpy()
+            snapshot = snapshot[latest].reset_index(drop=True)
+            snapshot_prints = snapshot_prints[latest].reset_index(drop=True)
+            snapshot_signatures = content_signatures(snapshot)
+
+            if self.job_data is None:
+                keep = np.empty(0, dtype=np.int64)
+                added_rows = np.arange(len(snapshot))
+                changed = 0
+            else:
+                # Position of each snapshot posting in the current dataset, or -1
+                current = pd.Index(self._fingerprints)
+                positions = current.get_indexer(snapshot_prints)
+                seen = positions >= 0
+                unchanged = seen.copy()
+                unchanged[seen] = self._signatures[positions[seen]] == snapshot_signatures[seen]
+                changed = int(seen.sum() - unchanged.sum())
+                added_rows = np.flatnonzero(~unchanged)
+
+                if drop_missing:
+                    keep = np.sort(positions[unchanged])
+                else:
+                    # Everything not replaced by the snapshot stays
+                    replaced = np.zeros(len(current), dtype=bool)
+                    replaced[positions[seen & ~unchanged]] = True
+                    keep = np.flatnonzero(~replaced)
+
+            if self.job_data is not None and not len(added_rows) and len(keep) == len(self.job_data):
+                # Nothing new, changed or expired: keep the current version
+                return {'version': self.version, 'jobs': len(self.job_data), 'kept': len(keep),
+                        'added': 0, 'changed': 0, 'expired': 0, 'encoded': 0}
+
+            added = snapshot.iloc[added_rows]
+            embeddings, encode_stats = encode_skill_sets(model, added['Skills'])
+
+            if self.job_data is None:
+                self.index = JobIndex(embeddings)
+                self.job_data = added.reset_index(drop=True)
+                self.skill_matrix = SkillMatrix.from_series(self.job_data['Skills'])
+                self.aggregates = build_aggregates(self.job_data, self.skill_matrix)
+                removed_count = 0
+            else:
+                dropped = np.setdiff1d(np.arange(len(self.job_data)), keep)
+                removed = self.job_data.iloc[dropped]
+                self.index = self.index.with_rows(keep, embeddings)
+                job_data = pd.concat([self.job_data.iloc[keep], added], ignore_index=True)
+                self.skill_matrix = self.skill_matrix.take(keep).append(added['Skills'])
+                self.aggregates = update_aggregates(self.aggregates, removed, added, job_data)
+                self.job_data = job_data
+                removed_count = len(dropped)
+
+            self._fingerprints = np.concatenate([
+                np.asarray(self._fingerprints if self._fingerprints is not None else [], dtype=object)[keep],
+                snapshot_prints.to_numpy(dtype=object)[added_rows],
+            ])
+            self._signatures = np.concatenate([
+                (self._signatures if self._signatures is not None else np.empty(0, dtype=np.uint64))[keep],
+                snapshot_signatures[added_rows],
+            ])
+            self.version += 1
+            self._save()
+
+            return {
+                'version': self.version,
+                'jobs': len(self.job_data),
+                'kept': len(keep),
+                'added': len(added_rows) - changed,
+                'changed': changed,
+                'expired': removed_count - changed,
+                'encoded': encode_stats['unique'],
+            }
+
+    def publish(self):
+        """
+        Seed the app's per-dataset caches with the current version, so pages
+        and the recommender use it without recomputing anything, and return
+        its (key, job_data), or (None, None) before the first snapshot.  Both
+        are taken under the lock, so they always belong to the same version.
+        """
+        with self._lock:
+            key = self.key
+            if key is None:
+                return None, None
+            dataset_cache.put(key, self.job_data)
+            skill_matrices.put(key, self.skill_matrix)
+            aggregates_cache.put(key, self.aggregates)
+            job_indexes.put(embedding_store.key(key, self.model_name), self.index)
+            return key, self.job_data
+
+
+# The live dataset of this server, shared by every session
+live_dataset = IncrementalDataset()
@@ -0,0 +1,151 @@
+"""
+Frequency tables behind the visualization tabs.
+
+All tables are computed in one pass over the dataset, fully sorted, and cached
+per dataset, so moving the "Number of items" slider only slices the top N
+instead of re-running value_counts and groupby over every row.  When a dataset
+is updated incrementally the tables are adjusted by the added and removed rows.
+"""
+import re
+
+from caching import LRUCache
+from skill_vocab import SkillMatrix
+
+_TITLE_CLEAN_RE = re.compile(r'[^a-zA-Z0-9\s]')
+
+
+def _clean_column(values):
+    # Same cleaning the tabs use: stringify, drop 'nan' and blank entries
+    values = values.astype(str).replace('nan', '').str.strip()
+    return values[values != '']
+
+
+def _company_pairs(job_data, column):
+    """Number of postings per (column, Company) pair, e.g. per (City, Company)."""
+    # Plain strings: value_counts over Categorical columns (columnar uploads)
+    # would count every combination of categories, observed or not
+    frame = job_data[[column, 'Company']].dropna().astype(str)
+    frame[column] = frame[column].str.strip()
+    frame = frame[frame[column] != '']
+    return frame.value_counts()
+
+
+def _unique_companies(pairs):
+    return pairs.groupby(level=0).size().rename('Company').sort_values(ascending=False, kind='stable')
+
+
+def _postings(pairs):
+    return pairs.groupby(level=0).sum().rename('count').sort_values(ascending=False, kind='stable')
+
+
+def _title_text(titles):
+    titles = titles.astype(str).replace('nan', '')
+    return ' '.join(titles.str.lower().str.replace(_TITLE_CLEAN_RE, '', regex=True))
+
+
+def build_aggregates(job_data, skill_matrix=None):
+    """
+    Sorted frequency tables for every visualization tab.  A table is None when
+    the dataset lacks the columns it needs.  Skill counts come from
+    skill_matrix, which is built from the 'Skills' column if not given.
+
+    The (Region, Company) and (City, Company) posting counts are kept too, so
+    update_aggregates() can maintain the unique-company tables incrementally.
+    """
+    columns = set(job_data.columns)
+    aggregates = dict.fromkeys([
+        'companies', 'titles', 'cities', 'skills', 'region_companies',
+        'city_postings', 'city_companies', 'title_text',
+        'region_company_pairs', 'city_company_pairs',
+    ])
+
+    if 'Company' in columns:
+        aggregates['companies'] = job_data['Company'].value_counts()
+
+    if 'Title' in columns:
+        aggregates['titles'] = job_data['Title'].value_counts()
+        aggregates['title_text'] = _title_text(job_data['Title'])
+
+    if 'City' in columns:
+        aggregates['cities'] = _clean_column(job_data['City']).value_counts()
+
+    if 'Skills' in columns:
+        if skill_matrix is None:
+            skill_matrix = SkillMatrix.from_series(job_data['Skills'])
+        aggregates['skills'] = skill_matrix.counts()
+
+    if 'Region' in columns and 'Company' in columns:
+        pairs = aggregates['region_company_pairs'] = _company_pairs(job_data, 'Region')
+        aggregates['region_companies'] = _unique_companies(pairs)
+
+    if 'City' in columns and 'Company' in columns:
+        pairs = aggregates['city_company_pairs'] = _company_pairs(job_data, 'City')
+        aggregates['city_companies'] = _unique_companies(pairs)
+        aggregates['city_postings'] = _postings(pairs)
+
+    return aggregates
+
+
+def _apply_delta(counts, removed, added):
+    """counts - removed + added, dropping zeros and re-sorted by frequency."""
+    updated = counts
+    if len(added):
+        updated = updated.add(added, fill_value=0)
+    if len(removed):
+        updated = updated.sub(removed, fill_value=0)
+    updated = updated[updated > 0].astype('int64').sort_values(ascending=False, kind='stable')
+    updated.name = counts.name
+    updated.index.names = counts.index.names
+    return updated
+
+
+def update_aggregates(aggregates, removed, added, job_data):
+    """
+    New aggregates after removing the rows in removed and adding those in
+    added, costing time proportional to the change rather than the dataset.
+    job_data is the updated dataset; only the word cloud text is re-joined
+    from it.  The given aggregates are left untouched.
+    """
+    updated = dict(aggregates)
+
+    for key, column in [('companies', 'Company'), ('titles', 'Title')]:
+        if aggregates[key] is not None:
+            updated[key] = _apply_delta(
+                aggregates[key], removed[column].value_counts(), added[column].value_counts()
+            )
+
+    if aggregates['title_text'] is not None:
+        updated['title_text'] = _title_text(job_data['Title'])
+
+    if aggregates['cities'] is not None:
+        updated['cities'] = _apply_delta(
+            aggregates['cities'],
+            _clean_column(removed['City']).value_counts(), _clean_column(added['City']).value_counts()
+        )
+
+    if aggregates['skills'] is not None:
+        updated['skills'] = _apply_delta(
+            aggregates['skills'],
+            SkillMatrix.from_series(removed['Skills']).counts(), SkillMatrix.from_series(added['Skills']).counts()
+        )
+
+    if aggregates['region_company_pairs'] is not None:
+        pairs = updated['region_company_pairs'] = _apply_delta(
+            aggregates['region_company_pairs'],
+            _company_pairs(removed, 'Region'), _company_pairs(added, 'Region')
+        )
+        updated['region_companies'] = _unique_companies(pairs)
+
+    if aggregates['city_company_pairs'] is not None:
+        pairs = updated['city_company_pairs'] = _apply_delta(
+            aggregates['city_company_pairs'],
+            _company_pairs(removed, 'City'), _company_pairs(added, 'City')
+        )
+        updated['city_companies'] = _unique_companies(pairs)
+        updated['city_postings'] = _postings(pairs)
+
+    return updated
+
+
+# Aggregates of the most recently used datasets, shared by every session
+aggregates_cache = LRUCache(max_entries=8, name='aggregates')
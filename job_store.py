@@ -0,0 +1,145 @@
+"""
+Columnar storage for cleaned job data.
+
+Datasets are stored as Arrow IPC (.arrow/.feather) or Parquet files with
+dictionary-encoded text columns (Title, Company, City, Region, ...), a
+list<string> Skills column and, optionally, the job embeddings as a
+fixed-size-list float32 column next to them.  Arrow IPC files are read through
+a memory map, so loading is limited by I/O rather than parsing and the
+embedding matrix is a zero-copy view of the file.  Text columns load as pandas
+Categoricals, which keeps repeated company and city names small in memory.
+
+Usage:
+    python job_store.py "final_cleand_data (1).csv" final_cleand_data.arrow --embeddings
+"""
+import argparse
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from skill_vocab import SEPARATOR, normalize_skill_column
+
+COLUMNAR_EXTENSIONS = ('.arrow', '.feather', '.parquet')
+
+EMBEDDING_COLUMN = 'embedding'
+
+# Schema metadata keys
+_DATASET_ID = b'wuzzuf.dataset_id'
+_MODEL_NAME = b'wuzzuf.model'
+
+
+def _column_to_arrow(values):
+    if values.name == 'Skills':
+        # Blank skill strings become null lists rather than ['']
+        skills = normalize_skill_column(values).replace('', None).astype(object)
+        return pc.split_pattern(pa.array(skills, type=pa.string()), SEPARATOR)
+    if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        return pa.array(values)
+    strings = values.astype(object).where(values.notna(), None)
+    return pa.array(strings, type=pa.string()).dictionary_encode()
+
+
+def to_arrow_table(job_data, embeddings=None, model_name=None):
+    """Arrow table for a prepared job DataFrame and optional embeddings."""
+    arrays = [_column_to_arrow(job_data[column]) for column in job_data.columns]
+    names = [str(column) for column in job_data.columns]
+    metadata = {_DATASET_ID: uuid.uuid4().hex.encode()}
+
+    if embeddings is not None:
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        arrays.append(pa.FixedSizeListArray.from_arrays(pa.array(embeddings.ravel()), embeddings.shape[1]))
+        names.append(EMBEDDING_COLUMN)
+        metadata[_MODEL_NAME] = model_name.encode()
+
+    return pa.Table.from_arrays(arrays, names=names, metadata=metadata)
+
+
+def write_job_table(path, job_data, embeddings=None, model_name=None):
+    table = to_arrow_table(job_data, embeddings, model_name)
+    if path.endswith('.parquet'):
+        pq.write_table(table, path)
+    else:
+        # Uncompressed, so the file can be memory-mapped without decoding
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _read_table(source, name):
+    if name.endswith('.parquet'):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = pa.BufferReader(source)
+        return pq.read_table(source, memory_map=True)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = pa.BufferReader(source)
+    else:
+        source = pa.memory_map(source, 'r')
+    return pa.ipc.open_file(source).read_all()
+
+
+def read_job_table(source, name=None):
+    """
+    Load a columnar job file from a path or from its bytes (name gives the
+    extension then).  Returns (job_data, embeddings, info): embeddings is a
+    float32 matrix or None, and info holds the file's dataset id and the
+    model that produced the embeddings.
+    """
+    name = name or source
+    table = _read_table(source, name)
+    metadata = table.schema.metadata or {}
+    info = {
+        'dataset_id': metadata.get(_DATASET_ID, b'').decode() or None,
+        'model_name': metadata.get(_MODEL_NAME, b'').decode() or None,
+    }
+
+    embeddings = None
+    if EMBEDDING_COLUMN in table.column_names:
+        column = table.column(EMBEDDING_COLUMN)
+        if column.num_chunks == 1:
+            chunk = column.chunk(0)
+            values = chunk.values.slice(chunk.offset * chunk.type.list_size, len(chunk) * chunk.type.list_size)
+        else:
+            values = pc.list_flatten(column.combine_chunks())
+        # Zero-copy view of the mapped file when the column is a single chunk
+        embeddings = values.to_numpy(zero_copy_only=column.null_count == 0)
+        embeddings = embeddings.reshape(len(column), column.type.list_size)
+        table = table.drop_columns([EMBEDDING_COLUMN])
+
+    if 'Skills' in table.column_names and pa.types.is_list(table.schema.field('Skills').type):
+        position = table.column_names.index('Skills')
+        skills = pc.binary_join(table.column('Skills'), SEPARATOR)
+        table = table.set_column(position, 'Skills', pc.fill_null(skills, ''))
+
+    return table.to_pandas(), embeddings, info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert job data to columnar Arrow/Parquet storage.")
+    parser.add_argument('input', help="CSV/XLSX job data with a Skills column")
+    parser.add_argument('output', help="destination .arrow, .feather or .parquet file")
+    parser.add_argument('--embeddings', action='store_true', help="also compute and store job embeddings")
+    parser.add_argument('--model', default=None, help="embedding model (defaults to the app's model)")
+    args = parser.parse_args()
+
+    from job_data import parse_job_file
+    with open(args.input, 'rb') as f:
+        job_data = parse_job_file(os.path.basename(args.input), f.read())
+
+    embeddings = model_name = None
+    if args.embeddings:
+        from model_registry import registry, DEFAULT_MODEL_NAME
+        from skill_encoding import encode_skill_sets
+        model_name = args.model or DEFAULT_MODEL_NAME
+        embeddings, encode_stats = encode_skill_sets(registry.get(model_name), job_data['Skills'])
+        print(f"Encoded {encode_stats['unique']} unique skill sets for {encode_stats['rows']} jobs")
+
+    write_job_table(args.output, job_data, embeddings, model_name)
+    print(f"Wrote {len(job_data)} jobs to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
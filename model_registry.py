@@ -0,0 +1,119 @@
+"""
+Process-wide registry for the sentence embedding models used by the app.
+
+Streamlit re-executes wuzzufAPP.py for every session and every rerun, but
+imported modules are only loaded once per server process.  Keeping the models
+here means every session shares a single copy of the weights instead of
+deserializing them on each "Get Recommendations" click.
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+
+def _load_sentence_transformer(name):
+    # Imported here so that pages which never need torch do not pay for it
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(name)
+
+
+def _model_memory_bytes(model):
+    """
+    Approximate resident size of a model from its parameters and buffers.
+    Returns None for objects that are not torch modules.
+    """
+    if not hasattr(model, 'parameters'):
+        return None
+    total = 0
+    for tensor in list(model.parameters()) + list(getattr(model, 'buffers', lambda: [])()):
+        total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class ModelRegistry:
+    """
+    Loads each model at most once per process and hands the same instance to
+    every caller.  Safe to use from concurrent Streamlit sessions.
+    """
+
+    def __init__(self, loader=_load_sentence_transformer):
+        self._loader = loader
+        self._models = {}
+        self._stats = {}
+        self._locks = {}
+        self._warmers = {}
+        self._registry_lock = threading.Lock()
+
+    def _lock_for(self, name):
+        with self._registry_lock:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name=DEFAULT_MODEL_NAME):
+        """Return the shared model, loading it on first use."""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        # One lock per model so loading a second model does not block the first
+        with self._lock_for(name):
+            model = self._models.get(name)
+            if model is None:
+                start = time.perf_counter()
+                model = self._loader(name)
+                load_seconds = time.perf_counter() - start
+                self._stats[name] = {
+                    'model': name,
+                    'load_seconds': load_seconds,
+                    'warmup_seconds': None,
+                    'memory_bytes': _model_memory_bytes(model),
+                }
+                self._models[name] = model
+                logger.info("Loaded model %s in %.2fs", name, load_seconds)
+        return model
+
+    def warm_up(self, name=DEFAULT_MODEL_NAME):
+        """Load the model and run a dummy encode so the first query is fast."""
+        model = self.get(name)
+        start = time.perf_counter()
+        model.encode(['python, sql, communication'])
+        self._stats[name]['warmup_seconds'] = time.perf_counter() - start
+        return model
+
+    def warm_up_async(self, name=DEFAULT_MODEL_NAME):
+        """
+        Start warming the model in a background thread.  Only the first call
+        per process starts a thread; later calls return the same one.
+        """
+        with self._registry_lock:
+            thread = self._warmers.get(name)
+            if thread is None:
+                thread = threading.Thread(
+                    target=self._warm_up_quietly, args=(name,),
+                    name=f"warm-{name}", daemon=True
+                )
+                self._warmers[name] = thread
+                thread.start()
+        return thread
+
+    def _warm_up_quietly(self, name):
+        try:
+            self.warm_up(name)
+        except Exception:
+            # The foreground get() will retry and surface the error to the user
+            logger.exception("Background warm-up of %s failed", name)
+
+    def is_loaded(self, name=DEFAULT_MODEL_NAME):
+        return name in self._models
+
+    def stats(self, name=DEFAULT_MODEL_NAME):
+        """Load time, warm-up time and memory footprint, or None if not loaded."""
+        stats = self._stats.get(name)
+        return dict(stats) if stats is not None else None
+
+
+# Shared by every session in this process
+registry = ModelRegistry()
@@ -0,0 +1,195 @@
+"""
+CPU-parallel embedding of large job datasets.
+
+The unique skill strings of a dataset are split into shards and encoded by a
+pool of worker processes, each holding its own copy of the model and limited
+to a few torch threads, so all cores of a CPU-only host are busy without the
+workers oversubscribing them.  Progress is reported after every shard and the
+build can be cancelled between shards.
+
+It can also run offline, filling the embedding store before the app is used:
+
+    python parallel_encoding.py "final_cleand_data (1).csv" --workers 8
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from model_registry import DEFAULT_MODEL_NAME, ModelRegistry, registry, _load_sentence_transformer
+from skill_encoding import DEFAULT_BATCH_SIZE, unique_skill_texts
+from tracing import tracer
+
+DEFAULT_WORKERS = int(os.environ.get('WUZZUF_EMBEDDING_WORKERS', os.cpu_count() or 1))
+
+# Starting workers and loading a model copy in each costs a few seconds, more
+# than encoding this many strings in the app process
+PARALLEL_MIN_UNIQUE = 5000
+
+SHARD_SIZE = 1024
+
+
+class EncodingCancelled(Exception):
+    """The embedding build was cancelled before it finished."""
+
+
+# Model of the current worker process
+_worker_registry = None
+_worker_model_name = None
+
+
+def _init_worker(model_name, threads, loader):
+    global _worker_registry, _worker_model_name
+    # Bound the math libraries before torch is imported by the loader
+    for variable in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[variable] = str(threads)
+    os.environ['TOKENIZERS_PARALLELISM'] = 'false'
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_registry = ModelRegistry(loader)
+    _worker_model_name = model_name
+    _worker_registry.get(model_name)
+
+
+def _encode_shard(texts, batch_size):
+    model = _worker_registry.get(_worker_model_name)
+    vectors = model.encode(texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def _check_cancel(cancel):
+    if cancel is not None and cancel.is_set():
+        raise EncodingCancelled("Embedding build cancelled")
+
+
+def _encode_in_process(model, shards, batch_size, progress, cancel):
+    total = sum(map(len, shards))
+    vectors = []
+    done = 0
+    if progress:
+        progress(done, total)
+    for shard in shards:
+        _check_cancel(cancel)
+        encoded = model.encode(shard, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+        vectors.append(np.asarray(encoded, dtype=np.float32))
+        done += len(shard)
+        if progress:
+            progress(done, total)
+    return vectors
+
+
+def _encode_in_pool(model_name, shards, workers, threads, loader, batch_size, progress, cancel):
+    total = sum(map(len, shards))
+    vectors = [None] * len(shards)
+    # spawn, not fork: torch's thread pools do not survive a fork
+    pool = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker, initargs=(model_name, threads, loader)
+    )
+    try:
+        pending = {pool.submit(_encode_shard, shard, batch_size): i for i, shard in enumerate(shards)}
+        done = 0
+        if progress:
+            progress(done, total)
+        while pending:
+            # Wake up regularly so a cancel is noticed during long shards too
+            finished, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            _check_cancel(cancel)
+            for future in finished:
+                i = pending.pop(future)
+                vectors[i] = future.result()
+                done += len(shards[i])
+            if finished and progress:
+                progress(done, total)
+    finally:
+        # Also reached when the caller is interrupted (e.g. a Streamlit rerun
+        # raised from the progress callback): drop the shards not started yet
+        pool.shutdown(wait=False, cancel_futures=True)
+    return vectors
+
+
+def encode_skill_sets_parallel(model_name, skill_sets, workers=DEFAULT_WORKERS, threads_per_worker=None,
+                               batch_size=DEFAULT_BATCH_SIZE, shard_size=SHARD_SIZE,
+                               progress=None, cancel=None, loader=_load_sentence_transformer):
+    """
+    Same result as skill_encoding.encode_skill_sets, computed by a pool of
+    worker processes.  Small inputs, or workers=1, are encoded in this
+    process with the shared model instead.
+
+    progress(done, total) is called as unique strings are encoded; cancel is
+    an optional threading.Event that stops the build with EncodingCancelled.
+    loader loads a model by name in each worker.
+    """
+    start = time.perf_counter()
+    codes, uniques = unique_skill_texts(skill_sets)
+    shards = [uniques[i:i + shard_size] for i in range(0, len(uniques), shard_size)]
+
+    workers = max(1, min(workers, len(shards)))
+    if not shards:
+        vectors = []
+    elif workers == 1 or len(uniques) < PARALLEL_MIN_UNIQUE:
+        workers = 1
+        model = registry.get(model_name) if loader is _load_sentence_transformer else loader(model_name)
+        with tracer.span('model.encode'):
+            vectors = _encode_in_process(model, shards, batch_size, progress, cancel)
+    else:
+        threads = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        with tracer.span('model.encode.pool'):
+            vectors = _encode_in_pool(model_name, shards, workers, threads, loader, batch_size, progress, cancel)
+    tracer.count('encodes', len(uniques))
+    tracer.count('encodes_saved', len(codes) - len(uniques))
+
+    matrix = np.concatenate(vectors)[codes] if vectors else np.empty((0, 0), dtype=np.float32)
+    stats = {
+        'rows': len(codes),
+        'unique': len(uniques),
+        'encodes_saved': len(codes) - len(uniques),
+        'batch_size': batch_size,
+        'workers': workers,
+        'seconds': time.perf_counter() - start,
+    }
+    return matrix, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute job embeddings ahead of time into the embedding store.")
+    parser.add_argument('data', help="job data file as uploaded to the app (CSV/XLSX/Arrow/Parquet)")
+    parser.add_argument('--model', default=DEFAULT_MODEL_NAME)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--threads-per-worker', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    from embedding_store import store as embedding_store
+    from job_data import JobDataError, dataset_key, parse_job_file
+
+    name = os.path.basename(args.data)
+    with open(args.data, 'rb') as f:
+        content = f.read()
+    # Same key the app derives for an upload of this file
+    key = dataset_key(name, content)
+    try:
+        job_data = parse_job_file(name, content)
+    except JobDataError as e:
+        parser.error(str(e))
+
+    def report(done, total):
+        print(f"\rEncoded {done}/{total} unique skill sets", end='', flush=True)
+
+    embeddings, encode_stats = encode_skill_sets_parallel(
+        args.model, job_data['Skills'], workers=args.workers,
+        threads_per_worker=args.threads_per_worker, batch_size=args.batch_size, progress=report
+    )
+    embedding_store.save(embedding_store.key(key, args.model), embeddings)
+    print(f"\nStored embeddings of {encode_stats['rows']} jobs ({encode_stats['unique']} unique skill sets) "
+          f"in {encode_stats['seconds']:.1f}s with {encode_stats['workers']} workers")
+
+
+if __name__ == '__main__':
+    main()
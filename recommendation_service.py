@@ -0,0 +1,244 @@
+"""
+HTTP/JSON front end for the recommendation engine, plus a load generator.
+
+    python recommendation_service.py serve "final_cleand_data (1).csv" --port 8502
+    python recommendation_service.py serve final_cleand_data.arrow --port 8502
+    curl -X POST localhost:8502/recommend -d '{"skills": "Python, SQL", "k": 5}'
+    curl -X POST localhost:8502/recommend -d '{"skills": "Python, SQL", "filters": {"City": ["Cairo"]}, "page": 1}'
+
+    python recommendation_service.py loadtest --url http://localhost:8502 --concurrency 32 --requests 2000
+
+Concurrent requests are micro-batched by the engine, so a burst of queries is
+encoded with one model.encode call.  Requests with filters, a page or a
+lexical_weight use the engine's hybrid ranking instead and are answered
+individually.
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import request as urllib_request
+
+import numpy as np
+
+from embedding_store import file_content_hash, store as embedding_store
+from job_data import JobDataError, dataset_key, datasets as dataset_cache
+from job_index import JobIndex, indexes as job_indexes
+from job_store import COLUMNAR_EXTENSIONS, read_job_table
+from model_registry import DEFAULT_MODEL_NAME
+from recommender import get_engine
+
+logger = logging.getLogger(__name__)
+
+# Columns returned for each matched job, when present in the dataset
+RESULT_COLUMNS = ['Title', 'Company', 'City', 'Region', 'Skills', 'similarity', 'skill_match', 'score']
+
+SAMPLE_QUERIES = [
+    "Python, SQL, Machine Learning",
+    "Customer Service, English, Call Center",
+    "Sales, Negotiation, Communication",
+    "Java, Spring, APIs",
+    "Accounting, Excel, Financial Reporting",
+    "Figma, UI/UX, Prototyping",
+    "Network Security, Cisco, VPN",
+    "Marketing, Social Media, Content Writing",
+]
+
+
+def jobs_to_records(top_jobs):
+    columns = [c for c in RESULT_COLUMNS if c in top_jobs.columns]
+    top_jobs = top_jobs[columns].astype(object)
+    return top_jobs.where(top_jobs.notna(), None).to_dict('records')
+
+
+class RecommendationServer(ThreadingHTTPServer):
+    # The default backlog of 5 refuses connections under a burst of clients
+    request_queue_size = 256
+    daemon_threads = True
+
+
+def make_handler(engine, timeout=30):
+    class RecommendationHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, default=float).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, {'status': 'ok'})
+            elif self.path == '/stats':
+                self._send_json(200, engine.stats())
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/recommend':
+                self._send_json(404, {'error': 'not found'})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                skills = payload['skills']
+                k = int(payload.get('k', 5))
+                if isinstance(skills, list):
+                    skills = ', '.join(map(str, skills))
+                if not str(skills).strip() or k < 1:
+                    raise ValueError("'skills' must be non-empty and 'k' positive")
+                filters = payload.get('filters') or {}
+                if not isinstance(filters, dict) or not all(isinstance(v, list) for v in filters.values()):
+                    raise ValueError("'filters' must map column names to lists of values")
+                page = int(payload.get('page', 0))
+                lexical_weight = float(payload.get('lexical_weight', 0.3))
+                if page < 0 or not 0 <= lexical_weight <= 1:
+                    raise ValueError("'page' must be >= 0 and 'lexical_weight' within [0, 1]")
+            except (KeyError, TypeError, ValueError) as e:
+                self._send_json(400, {'error': f"invalid request: {e}"})
+                return
+
+            start = time.perf_counter()
+            try:
+                if filters or page or 'lexical_weight' in payload:
+                    top_jobs, total = engine.search(skills, filters, k, page, lexical_weight)
+                    response = {'jobs': jobs_to_records(top_jobs), 'total': total, 'page': page}
+                else:
+                    top_jobs = engine.submit(skills, k).result(timeout=timeout)
+                    response = {'jobs': jobs_to_records(top_jobs)}
+            except FutureTimeoutError:
+                self._send_json(503, {'error': f"no result within {timeout}s, try again later"})
+                return
+            except Exception as e:
+                logger.exception("Recommendation failed for %r", skills)
+                self._send_json(500, {'error': f"recommendation failed: {e}"})
+                return
+            response['took_ms'] = (time.perf_counter() - start) * 1000
+            self._send_json(200, response)
+
+        def log_message(self, format, *args):
+            # Per-request logging would dominate the cost of a micro-batched query
+            pass
+
+    return RecommendationHandler
+
+
+def _load_columnar_engine(path, model_name, **engine_options):
+    # Memory-mapped, so startup does not read or hash the whole file of a
+    # dataset written by job_store; the stored embeddings back the index
+    # directly when they match the model
+    try:
+        job_data, embeddings, info = read_job_table(path)
+    except (OSError, ValueError) as e:
+        raise JobDataError(f"Cannot read {path}: {e}")
+    if 'Skills' not in job_data.columns:
+        raise JobDataError("The data file must contain a 'Skills' column.")
+    # Files written without our metadata (e.g. a plain DataFrame.to_parquet)
+    # have no id and are keyed by their content like an upload
+    dataset_id = info['dataset_id'] or file_content_hash(path)
+    key = f"{dataset_id}{os.path.splitext(path)[1]}"
+    if embeddings is not None and info['model_name'] == model_name and len(embeddings) == len(job_data):
+        job_indexes.put(embedding_store.key(key, model_name), JobIndex(embeddings))
+    return get_engine(key, job_data, model_name, notify=print, **engine_options)
+
+
+def load_engine(path, model_name=DEFAULT_MODEL_NAME, **engine_options):
+    if path.endswith(COLUMNAR_EXTENSIONS):
+        return _load_columnar_engine(path, model_name, **engine_options)
+    with open(path, 'rb') as f:
+        content = f.read()
+    name = os.path.basename(path)
+    key = dataset_key(name, content)
+    job_data = dataset_cache.load(name, content, key=key)
+    return get_engine(key, job_data, model_name, notify=print, **engine_options)
+
+
+def serve(engine, host='127.0.0.1', port=8502):
+    server = RecommendationServer((host, port), make_handler(engine))
+    print(f"Serving recommendations for {len(engine.job_data)} jobs on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def run_load_test(url, queries=SAMPLE_QUERIES, concurrency=32, total_requests=1000, k=5):
+    """
+    Send total_requests POST /recommend calls from concurrency threads and
+    report throughput and latency percentiles in milliseconds.
+    """
+    endpoint = url.rstrip('/') + '/recommend'
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one_request(i):
+        nonlocal errors
+        body = json.dumps({'skills': queries[i % len(queries)], 'k': k}).encode('utf-8')
+        req = urllib_request.Request(endpoint, data=body, headers={'Content-Type': 'application/json'})
+        start = time.perf_counter()
+        try:
+            with urllib_request.urlopen(req, timeout=60) as response:
+                response.read()
+        except OSError:
+            with lock:
+                errors += 1
+            return
+        with lock:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_request, range(total_requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) if latencies else np.zeros(1)
+    return {
+        'requests': total_requests,
+        'errors': errors,
+        'concurrency': concurrency,
+        'seconds': elapsed,
+        'throughput_rps': (total_requests - errors) / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job recommendation HTTP service.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help="serve recommendations for a job data file")
+    serve_parser.add_argument('data', help="CSV/XLSX/Arrow/Parquet job data with a Skills column")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8502)
+    serve_parser.add_argument('--model', default=DEFAULT_MODEL_NAME)
+    serve_parser.add_argument('--max-batch', type=int, default=64, help="largest micro-batch")
+    serve_parser.add_argument('--max-wait-ms', type=float, default=5, help="how long a batch waits to fill")
+
+    load_parser = commands.add_parser('loadtest', help="measure throughput and latency of a running service")
+    load_parser.add_argument('--url', default='http://127.0.0.1:8502')
+    load_parser.add_argument('--concurrency', type=int, default=32)
+    load_parser.add_argument('--requests', type=int, default=1000)
+    load_parser.add_argument('--k', type=int, default=5)
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        try:
+            engine = load_engine(args.data, args.model, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+        except JobDataError as e:
+            parser.error(str(e))
+        serve(engine, args.host, args.port)
+    else:
+        print(json.dumps(run_load_test(args.url, concurrency=args.concurrency,
+                                       total_requests=args.requests, k=args.k), indent=2))
+
+
+if __name__ == '__main__':
+    main()
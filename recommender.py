@@ -0,0 +1,269 @@
+"""
+Headless job recommendation engine.
+
+This is the matching core behind the recommender page: it owns one dataset's
+job index and the shared embedding model, and can be used from the Streamlit
+app, the HTTP service in recommendation_service.py, or any other Python code.
+
+Queries submitted concurrently through submit() are grouped into micro-batches
+(up to max_batch queries, waiting at most max_wait_ms for more to arrive) and
+encoded with a single model.encode call; each is then ranked exactly like the
+recommender page's default search.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from caching import LRUCache
+from embedding_store import store as embedding_store
+from hybrid_ranking import HybridRanker
+from job_index import JobIndex, indexes as job_indexes
+from model_registry import registry, DEFAULT_MODEL_NAME
+from parallel_encoding import PARALLEL_MIN_UNIQUE, encode_skill_sets_parallel
+from skill_encoding import normalize_skills_text
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+def build_job_index(dataset_key, job_data, model_name=DEFAULT_MODEL_NAME, notify=None, progress=None):
+    """
+    Index for the dataset, reusing the in-memory index or the stored
+    embeddings when possible and encoding the jobs otherwise.  notify, if
+    given, is called with status messages meant for the user, and progress
+    with (done, total) counts while the jobs are encoded.
+    """
+    store_key = embedding_store.key(dataset_key, model_name)
+
+    def build():
+        job_embeddings = embedding_store.load(store_key, expected_rows=len(job_data))
+        if job_embeddings is None:
+            if notify:
+                notify("🧠 Calculating embeddings for the job data based on skills...")
+            job_embeddings, encode_stats = encode_skill_sets_parallel(
+                model_name, job_data['Skills'], progress=progress
+            )
+            job_embeddings = embedding_store.save(store_key, job_embeddings)
+            if notify:
+                notify(f"Encoded {encode_stats['unique']} unique skill sets for {encode_stats['rows']} jobs "
+                       f"with {encode_stats['workers']} worker(s) "
+                       f"({encode_stats['encodes_saved']} duplicate encodes skipped)")
+        return JobIndex(job_embeddings)
+
+    return job_indexes.get_or_build(store_key, build)
+
+
+def needs_long_build(dataset_key, job_data, model_name=DEFAULT_MODEL_NAME):
+    """
+    True when the dataset's index is neither in memory nor stored and enough
+    unique skill sets have to be encoded to start the worker pool.
+    """
+    store_key = embedding_store.key(dataset_key, model_name)
+    if job_indexes.get(store_key) is not None or os.path.exists(embedding_store.path(store_key)):
+        return False
+    return job_data['Skills'].nunique() >= PARALLEL_MIN_UNIQUE
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from many threads and hands them to
+    handle_batch(items) in groups, resolving one Future per item.
+    """
+
+    def __init__(self, handle_batch, max_batch=64, max_wait=0.005):
+        self.handle_batch = handle_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, item):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._thread.start()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            items = [item for item, _ in batch]
+            try:
+                results = self.handle_batch(items)
+            except Exception as e:
+                logger.exception("Batch of %d items failed", len(items))
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(items)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'mean_batch_size': self.items / self.batches if self.batches else 0.0,
+        }
+
+
+class RecommendationEngine:
+    """Top-k job matching for one dataset."""
+
+    def __init__(self, job_data, job_index, model, max_batch=64, max_wait_ms=5):
+        self.job_data = job_data
+        self.job_index = job_index
+        self.model = model
+        self._batcher = MicroBatcher(self._recommend_items, max_batch, max_wait_ms / 1000)
+        self._ranker = None
+        self._ranker_lock = threading.Lock()
+
+    def _encode_queries(self, queries):
+        texts = [normalize_skills_text(q) for q in queries]
+        with tracer.span('model.encode.queries'):
+            user_embeddings = self.model.encode(
+                texts, batch_size=len(texts), convert_to_numpy=True, show_progress_bar=False
+            )
+        tracer.count('query_encodes', len(texts))
+        return user_embeddings
+
+    def _top_jobs(self, rows, scores):
+        top_jobs = self.job_data.iloc[rows].copy()
+        for column, values in scores.items():
+            top_jobs[column] = values
+        return top_jobs
+
+    def recommend_many(self, queries, k=5):
+        """
+        Top-k jobs for each comma-separated skills query, ranked like an
+        unfiltered search() with its defaults.  All queries are encoded in one
+        call.
+        """
+        if not queries:
+            return []
+        user_embeddings = self._encode_queries(queries)
+        results = []
+        with tracer.span('hybrid.rank'):
+            for query, user_embedding in zip(queries, user_embeddings):
+                rows, scores, _ = self.ranker.rank(user_embedding, query, k=k)
+                results.append(self._top_jobs(rows, scores))
+        return results
+
+    def recommend(self, user_skills, k=5):
+        """
+        Top-k jobs for a single query, as a DataFrame with 'similarity',
+        'skill_match' and 'score' columns.
+        """
+        return self.recommend_many([user_skills], k)[0]
+
+    def _recommend_items(self, items):
+        # Items may ask for different k; score once with the largest and slice
+        max_k = max(k for _, k in items)
+        results = self.recommend_many([skills for skills, _ in items], max_k)
+        return [top_jobs.head(k) for top_jobs, (_, k) in zip(results, items)]
+
+    @property
+    def ranker(self):
+        # Inverted indexes are built on the first query, not with the engine
+        with self._ranker_lock:
+            if self._ranker is None:
+                self._ranker = HybridRanker(self.job_data, self.job_index.vectors, index=self.job_index)
+            return self._ranker
+
+    def search(self, user_skills, filters=None, k=5, page=0, lexical_weight=0.3, lexical='bm25'):
+        """
+        One page of hybrid results for a skills query, restricted by filters
+        ({column: [values]}): a DataFrame with 'similarity', 'skill_match'
+        and 'score' columns, and the total number of ranked jobs.
+        """
+        user_embedding = self._encode_queries([user_skills])[0]
+        with tracer.span('hybrid.rank'):
+            rows, scores, total = self.ranker.rank(
+                user_embedding, user_skills, filters, k=k, page=page,
+                lexical_weight=lexical_weight, lexical=lexical
+            )
+        return self._top_jobs(rows, scores), total
+
+    def submit(self, user_skills, k=5):
+        """Queue a query for micro-batching; returns a Future of its top-k DataFrame."""
+        return self._batcher.submit((user_skills, k))
+
+    def stats(self):
+        return {'jobs': len(self.job_data), 'approximate': self.job_index.approximate, **self._batcher.stats()}
+
+
+# Engines of the most recently used datasets, shared by every session
+engines = LRUCache(max_entries=4, name='engines')
+
+# Background builds started by warm_engine_async, by (dataset key, model)
+_warmers = {}
+_warmers_lock = threading.Lock()
+
+
+def warm_engine_async(dataset_key, load_job_data, model_name=DEFAULT_MODEL_NAME):
+    """
+    Build the dataset's engine in a background thread, once per dataset.
+    load_job_data is called in that thread and returns the job DataFrame.
+
+    Datasets that need a long encoding run are skipped: that build is left to
+    the foreground, where it reports progress and can be cancelled, instead
+    of blocking the first query on a background thread that cannot.
+    """
+    key = (dataset_key, model_name)
+    with _warmers_lock:
+        thread = _warmers.get(key)
+        if thread is None and engines.get(key) is None:
+            def warm():
+                try:
+                    job_data = load_job_data()
+                    if needs_long_build(dataset_key, job_data, model_name):
+                        logger.info("Not prewarming %s: its embeddings need a long build", dataset_key)
+                        return
+                    get_engine(dataset_key, job_data, model_name)
+                except Exception:
+                    # The foreground get_engine() will retry and surface the error
+                    logger.exception("Background build of the engine for %s failed", dataset_key)
+
+            thread = _warmers[key] = threading.Thread(target=warm, name=f"warm-engine-{dataset_key}", daemon=True)
+            thread.start()
+    return thread
+
+
+def get_engine(dataset_key, job_data, model_name=DEFAULT_MODEL_NAME, notify=None, progress=None,
+               **engine_options):
+    """The shared engine for a dataset, building its index on first use."""
+    warmer = _warmers.get((dataset_key, model_name))
+    if warmer is not None and warmer is not threading.current_thread():
+        # Let a background build finish rather than encoding the jobs twice
+        if notify and warmer.is_alive():
+            notify("⏳ Finishing the background preparation of this dataset...")
+        warmer.join()
+
+    def build():
+        model = registry.get(model_name)
+        job_index = build_job_index(dataset_key, job_data, model_name, notify, progress)
+        return RecommendationEngine(job_data, job_index, model, **engine_options)
+
+    return engines.get_or_build((dataset_key, model_name), build)
@@ -0,0 +1,168 @@
+"""
+Skill co-occurrence and skills-gap analytics.
+
+The skill x skill co-occurrence counts of a dataset are one sparse product of
+its job x skill incidence matrix, X.T @ X: entry (a, b) is the number of jobs
+listing both a and b.  The vocabulary grows with every scrape, so only the
+max_neighbors most frequent partners of each skill are kept, together with
+their pointwise mutual information
+
+    pmi(a, b) = log(jobs(a, b) * jobs / (jobs(a) * jobs(b)))
+
+and the product is computed a block of skills at a time, so neither the kept
+lists nor the intermediate result grow with the square of the vocabulary.
+
+Skills are compared lowercased, like the recommender's skill matching.
+"""
+import numpy as np
+import pandas as pd
+
+from caching import LRUCache
+from hybrid_ranking import query_skills
+from skill_vocab import SkillMatrix, normalize_skill_column
+
+# Partners kept per skill
+DEFAULT_MAX_NEIGHBORS = 50
+
+# Skills per block of the X.T @ X product
+_PRODUCT_BLOCK_SKILLS = 4096
+
+
+def _top_per_row(rows, columns, values, k):
+    """Entries of the k largest values of each row, grouped by row."""
+    order = np.lexsort((columns, -values, rows))
+    rows, columns, values = rows[order], columns[order], values[order]
+    starts = np.searchsorted(rows, rows, side='left')
+    keep = np.arange(len(rows)) - starts < k
+    return rows[keep], columns[keep], values[keep]
+
+
+class SkillCooccurrence:
+    """
+    Top co-occurring skills of one dataset.  skills is a SkillMatrix of
+    lowercased skill strings, row-aligned with the dataset: the recommender's
+    HybridRanker.skills, or SkillMatrix.lowercased() of the dataset's shared
+    matrix, so the column is not tokenized again.
+    """
+
+    def __init__(self, skills, max_neighbors=DEFAULT_MAX_NEIGHBORS, block_skills=_PRODUCT_BLOCK_SKILLS):
+        self.skills = skills
+        self.max_neighbors = max_neighbors
+        self.job_counts = np.bincount(skills.indices, minlength=skills.n_skills)
+
+        incidence = skills.to_csr()
+        transposed = incidence.T.tocsr()
+        kept_rows, kept_columns, kept_counts = [], [], []
+        for start in range(0, skills.n_skills, block_skills):
+            block = (transposed[start:start + block_skills] @ incidence).tocoo()
+            rows = block.row.astype(np.int64) + start
+            columns = block.col.astype(np.int64)
+            # A skill's count with itself is just its own frequency
+            partner = rows != columns
+            rows, columns, counts = _top_per_row(
+                rows[partner], columns[partner], block.data[partner].astype(np.int64), max_neighbors
+            )
+            kept_rows.append(rows)
+            kept_columns.append(columns)
+            kept_counts.append(counts)
+
+        rows = np.concatenate(kept_rows) if kept_rows else np.empty(0, dtype=np.int64)
+        self._indptr = np.zeros(skills.n_skills + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=skills.n_skills), out=self._indptr[1:])
+        self._neighbors = (np.concatenate(kept_columns) if kept_columns else rows).astype(np.int32)
+        self._counts = (np.concatenate(kept_counts) if kept_counts else rows).astype(np.int32)
+        self._pmi = self._pmi_of(rows, self._neighbors, self._counts)
+
+    @classmethod
+    def from_series(cls, skills, **options):
+        """Co-occurrence of a 'Skills' column of comma-separated skill strings."""
+        return cls(SkillMatrix.from_series(normalize_skill_column(skills).str.lower()), **options)
+
+    def _pmi_of(self, skills, partners, counts):
+        jobs = max(self.skills.n_jobs, 1)
+        expected = self.job_counts[skills].astype(np.float64) * self.job_counts[partners]
+        return np.log(counts * jobs / np.maximum(expected, 1.0)).astype(np.float32)
+
+    @property
+    def nnz(self):
+        return len(self._neighbors)
+
+    def _frame(self, codes, counts, pmi, n):
+        frame = pd.DataFrame({
+            'skill': self.skills.vocabulary[codes],
+            'jobs': counts.astype(np.int64),
+            'pmi': np.round(pmi, 3),
+        })
+        return frame.sort_values(['jobs', 'pmi'], ascending=False, kind='stable').head(n).reset_index(drop=True)
+
+    def neighbors(self, skill, n=10):
+        """Skills most often listed together with skill: 'skill', 'jobs' and 'pmi' columns."""
+        codes = self.skills.codes_for([str(skill).strip().lower()])
+        if not len(codes):
+            return self._frame(np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), n)
+        start, end = self._indptr[codes[0]], self._indptr[codes[0] + 1]
+        return self._frame(self._neighbors[start:end], self._counts[start:end], self._pmi[start:end], n)
+
+    def related_skills(self, user_skills, rows=None, n=10):
+        """
+        Skills most often listed in the jobs matching the user's skills
+        (comma-separated) that the user does not have yet.
+
+        Without rows the kept neighbor lists are summed, so a job listing
+        several of the user's skills counts once for each.  With rows (e.g.
+        the jobs left by the recommender's filters) the jobs among them that
+        list any of the user's skills are counted exactly, and pmi compares
+        each skill's share of those jobs with its share of the dataset.
+        """
+        codes = self.skills.codes_for(query_skills(user_skills))
+        if not len(codes):
+            return self._frame(np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), n)
+
+        if rows is None:
+            positions = np.concatenate([np.arange(self._indptr[c], self._indptr[c + 1]) for c in codes])
+            partners = self._neighbors[positions]
+            counts = np.bincount(partners, weights=self._counts[positions], minlength=self.skills.n_skills)
+            matched = len(self.skills.jobs_with_any(self.skills.vocabulary[codes]))
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+            matched_rows = rows[self.skills.take(rows).overlap(self.skills.vocabulary[codes]) > 0]
+            counts = np.bincount(self.skills.take(matched_rows).indices, minlength=self.skills.n_skills)
+            matched = len(matched_rows)
+
+        counts[codes] = 0
+        partners = np.flatnonzero(counts)
+        share = counts[partners] / max(matched, 1)
+        pmi = np.log(share * max(self.skills.n_jobs, 1) / self.job_counts[partners])
+        return self._frame(partners, counts[partners], pmi, n)
+
+    def unlocking_skills(self, user_skills, rows=None, n=10, coverage=0.5):
+        """
+        Missing skills that would bring the most postings within reach: a
+        DataFrame with 'skill' and 'postings' columns, and the number of
+        postings already within reach.
+
+        A posting is within reach when the user has at least coverage of its
+        skills (at least one).  Adding a skill reaches every posting one
+        skill short that lists it.  rows restricts the postings considered.
+        """
+        matrix = self.skills if rows is None else self.skills.take(rows)
+        user = np.zeros(self.skills.n_skills, dtype=bool)
+        user[self.skills.codes_for(query_skills(user_skills))] = True
+
+        lengths = np.diff(matrix.indptr)
+        have = matrix.overlap(self.skills.vocabulary[user])
+        need = np.maximum(np.ceil(coverage * lengths), 1)
+        one_short = (lengths > 0) & (need - have == 1)
+
+        entry_rows = np.repeat(one_short, lengths)
+        missing = matrix.indices[entry_rows & ~user[matrix.indices]]
+        postings = np.bincount(missing, minlength=self.skills.n_skills)
+        codes = np.flatnonzero(postings)
+        order = np.argsort(-postings[codes], kind='stable')[:n]
+
+        frame = pd.DataFrame({'skill': self.skills.vocabulary[codes[order]], 'postings': postings[codes[order]]})
+        return frame, int(((lengths > 0) & (have >= need)).sum())
+
+
+# Co-occurrence of the most recently used datasets, shared by every session
+cooccurrence_cache = LRUCache(max_entries=8, name='skill_cooccurrence')
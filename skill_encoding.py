@@ -0,0 +1,76 @@
+"""
+Batched, deduplicated encoding of job skill sets.
+
+Scraped datasets repeat the same predicted skill string on many rows (the
+fallback "java, apis, net, communication, python, sql" alone covers a large
+share of final_cleand_data.csv), so each distinct string is encoded once in
+large batches and the vectors are scattered back to the rows.
+"""
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from tracing import tracer
+
+DEFAULT_BATCH_SIZE = int(os.environ.get('WUZZUF_EMBEDDING_BATCH_SIZE', 256))
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_skills_text(skills):
+    """
+    Canonical text for a skill set, given as a list or a comma-separated
+    string.  The MiniLM tokenizer is uncased, so lowercasing does not change
+    the embedding but lets differently-cased duplicates share one encode.
+    """
+    if isinstance(skills, str):
+        skills = skills.split(',')
+    cleaned = (_WHITESPACE_RE.sub(' ', str(s)).strip().lower() for s in skills)
+    return ', '.join(s for s in cleaned if s)
+
+
+def unique_skill_texts(skill_sets):
+    """
+    Normalized texts of the skill sets, deduplicated.  Returns (codes,
+    uniques): row i of the input has text uniques[codes[i]].
+    """
+    texts = [normalize_skills_text(s) for s in skill_sets]
+    codes, uniques = pd.factorize(pd.Series(texts, dtype=object))
+    return codes, list(uniques)
+
+
+def encode_skill_sets(model, skill_sets, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Encode every skill set and return (matrix, stats).
+
+    matrix has one float32 row per input skill set.  stats reports how many
+    rows were requested, how many unique strings were actually encoded and how
+    many encodes the deduplication saved.
+    """
+    start = time.perf_counter()
+    codes, uniques = unique_skill_texts(skill_sets)
+
+    if len(uniques):
+        with tracer.span('model.encode'):
+            unique_vectors = model.encode(
+                uniques, batch_size=batch_size,
+                convert_to_numpy=True, show_progress_bar=False
+            )
+        unique_vectors = np.asarray(unique_vectors, dtype=np.float32)
+        matrix = unique_vectors[codes]
+    else:
+        matrix = np.empty((0, 0), dtype=np.float32)
+
+    tracer.count('encodes', len(uniques))
+    tracer.count('encodes_saved', len(codes) - len(uniques))
+    stats = {
+        'rows': len(codes),
+        'unique': len(uniques),
+        'encodes_saved': len(codes) - len(uniques),
+        'batch_size': batch_size,
+        'seconds': time.perf_counter() - start,
+    }
+    return matrix, stats
@@ -0,0 +1,166 @@
+"""
+Batch skill prediction for scraped job titles.
+
+Scraped Wuzzuf listings only have a title, so their skills are predicted from
+the labeled Wuzzuf_Jobs.csv: the closest training title by TF-IDF cosine
+distance, falling back to keyword rules.  This is the notebook's
+predict_skills_enhanced() applied to a whole column at once: all titles are
+cleaned with vectorized string operations, transformed into one sparse matrix
+and matched with a single kneighbors call.  The fitted vectorizer and neighbor
+index are saved next to the other caches and reused while the training file is
+unchanged.
+
+Usage:
+    python skill_prediction.py scraping_Data.csv --output final_Data.csv
+"""
+import argparse
+import hashlib
+import os
+import re
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.neighbors import NearestNeighbors
+
+from embedding_store import DEFAULT_CACHE_DIR
+
+TRAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Wuzzuf_Jobs.csv')
+
+# Dictionary for standardizing similar job titles, applied in order
+SYNONYMS = {
+    'software engineer': 'backend developer',
+    'it specialist': 'network engineer',
+    'programmer': 'full stack developer',
+    'data entry': 'data clerk',
+    'hr': 'human resources'
+}
+
+DOMAIN_SKILLS = {
+    'data': ['python', 'sql', 'data analysis', 'machine learning'],
+    'developer': ['programming', 'debugging', 'version control', 'algorithms'],
+    'analyst': ['excel', 'power bi', 'statistics', 'reporting'],
+    'engineer': ['problem solving', 'system design', 'troubleshooting'],
+    'scientist': ['research methods', 'data analysis', 'statistics'],
+    'network': ['cisco', 'tcp/ip', 'network security', 'vpn'],
+    'design': ['figma', 'ui/ux', 'wireframing', 'prototyping'],
+}
+
+DEPARTMENT_SKILLS = {
+    'it': ['computer literacy', 'troubleshooting', 'systems administration'],
+    'hr': ['recruitment', 'employee relations', 'labor laws'],
+    'finance': ['accounting', 'financial reporting', 'excel', 'quickbooks']
+}
+
+DEFAULT_SKILLS = "python, Java, APIs, communication, sql, .Net"
+
+# Nearest training titles closer than this lend their skills
+MAX_DISTANCE = 0.45
+
+_PARENTHESES_RE = re.compile(r'\(.*?\)')
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def clean_titles(titles):
+    """Vectorized version of the notebook's clean_text() for job titles."""
+    titles = titles.fillna('').astype(str)
+    titles = titles.str.replace(_PARENTHESES_RE, '', regex=True)
+    titles = titles.str.replace(_PUNCTUATION_RE, ' ', regex=True)
+    titles = titles.str.replace(_WHITESPACE_RE, ' ', regex=True).str.strip()
+    return titles.str.lower()
+
+
+def apply_synonyms(titles):
+    # Sequential plain-substring replacements, exactly like the per-title loop
+    for original, synonym in SYNONYMS.items():
+        titles = titles.str.replace(original, synonym, regex=False)
+    return titles
+
+
+def _first_keyword_match(titles, rules, result):
+    """Fill unset entries of result with the skills of the first keyword found."""
+    for keyword, skills in rules.items():
+        unset = result.isna()
+        if not unset.any():
+            break
+        hits = unset & titles.str.contains(keyword, regex=False)
+        result[hits] = ', '.join(skills)
+    return result
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SkillPredictor:
+    """TF-IDF nearest-neighbor skill predictor fitted on labeled job titles."""
+
+    def __init__(self, train_titles, train_skills):
+        self.train_skills = np.asarray(train_skills, dtype=object)
+        self.vectorizer = TfidfVectorizer()
+        title_vectors = self.vectorizer.fit_transform(clean_titles(pd.Series(train_titles)))
+        self.model = NearestNeighbors(n_neighbors=1, metric='cosine')
+        self.model.fit(title_vectors)
+
+    @classmethod
+    def from_csv(cls, path=TRAIN_PATH):
+        train_data = pd.read_csv(path)
+        train_data = train_data.dropna(subset=['Title', 'Skills'])
+        return cls(train_data['Title'].str.lower().str.strip(), train_data['Skills'].str.lower().str.strip())
+
+    @classmethod
+    def load_or_fit(cls, train_path=TRAIN_PATH, cache_dir=None):
+        """Reuse the predictor saved for this training file, fitting it on a miss."""
+        cache_dir = os.path.join(cache_dir or DEFAULT_CACHE_DIR, 'skill_predictor')
+        path = os.path.join(cache_dir, f"{_file_digest(train_path)}.joblib")
+        if os.path.exists(path):
+            return joblib.load(path)
+        predictor = cls.from_csv(train_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        joblib.dump(predictor, path)
+        return predictor
+
+    def predict(self, titles):
+        """Predicted skills string for every title, as a Series aligned with titles."""
+        titles = pd.Series(titles)
+        cleaned = apply_synonyms(clean_titles(titles))
+        result = pd.Series(np.nan, index=titles.index, dtype=object)
+        if titles.empty:
+            return result
+
+        distances, indices = self.model.kneighbors(self.vectorizer.transform(cleaned))
+        close = distances[:, 0] < MAX_DISTANCE
+        result[close] = self.train_skills[indices[close, 0]]
+
+        result = _first_keyword_match(cleaned, DOMAIN_SKILLS, result)
+        result = _first_keyword_match(cleaned, DEPARTMENT_SKILLS, result)
+        return result.fillna(DEFAULT_SKILLS)
+
+
+def predict_skills_enhanced(job_title, predictor=None):
+    """Single-title convenience wrapper with the notebook's signature."""
+    predictor = predictor or SkillPredictor.load_or_fit()
+    return predictor.predict(pd.Series([job_title])).iloc[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predict skills for scraped Wuzzuf job titles.")
+    parser.add_argument('input', help="CSV with a Title column (e.g. scraping_Data.csv)")
+    parser.add_argument('--output', default='final_Data.csv', help="CSV to write with a Skills column")
+    parser.add_argument('--train', default=TRAIN_PATH, help="labeled jobs with Title and Skills")
+    args = parser.parse_args()
+
+    new_data = pd.read_csv(args.input)
+    new_data['Skills'] = SkillPredictor.load_or_fit(args.train).predict(new_data['Title'])
+    new_data.to_csv(args.output, index=False, encoding='utf-8-sig')
+    print(f"Predicted skills for {len(new_data)} jobs into {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Vectorized skill tokenization.
+
+The 'Skills' column is normalized once into canonical "skill, skill" strings
+and tokenized into an interned vocabulary plus a CSR-style job x skill
+incidence matrix (indptr/indices of integer skill codes).  Skill counting,
+filtering and matching work on that matrix instead of per-row Python lists.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from caching import LRUCache
+
+SEPARATOR = ', '
+
+# A run of commas together with the whitespace around them
+_SEPARATOR_RE = re.compile(r'\s*(?:,\s*)+')
+
+
+def normalize_skill_column(skills):
+    """
+    Canonical comma-separated skill strings: tokens stripped, blank tokens
+    dropped, joined with ', '.  Case is preserved and missing values become ''.
+    """
+    skills = skills.fillna('').astype(str).str.replace(_SEPARATOR_RE, SEPARATOR, regex=True)
+    return skills.str.strip().str.strip(',').str.strip()
+
+
+class SkillMatrix:
+    """
+    Job x skill incidence matrix in CSR layout.
+
+    vocabulary is a pd.Index of the distinct skills; the codes of row i are
+    indices[indptr[i]:indptr[i + 1]], sorted and without duplicates.
+    """
+
+    def __init__(self, vocabulary, indptr, indices):
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.indices = indices
+        self._rows = None
+        self._columns = None
+
+    @classmethod
+    def from_series(cls, skills):
+        """Tokenize a column of canonical skill strings (see normalize_skill_column)."""
+        skills = pd.Series(skills, dtype=object).fillna('').astype(str).reset_index(drop=True)
+        non_empty = skills != ''
+        tokens_per_row = np.where(non_empty, skills.str.count(SEPARATOR) + 1, 0)
+
+        # One split over the whole column instead of one per row
+        tokens = SEPARATOR.join(skills[non_empty]).split(SEPARATOR) if non_empty.any() else []
+        codes, vocabulary = pd.factorize(pd.Series(tokens, dtype=object))
+        rows = np.repeat(np.arange(len(skills), dtype=np.int64), tokens_per_row)
+
+        # Sort and deduplicate (row, code) pairs in a single np.unique
+        n_skills = max(len(vocabulary), 1)
+        pairs = np.unique(rows * n_skills + codes)
+        rows, codes = np.divmod(pairs, n_skills)
+        indptr = np.zeros(len(skills) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(skills)), out=indptr[1:])
+        return cls(pd.Index(vocabulary, dtype=object), indptr, codes.astype(np.int32))
+
+    @property
+    def n_jobs(self):
+        return len(self.indptr) - 1
+
+    @property
+    def n_skills(self):
+        return len(self.vocabulary)
+
+    @property
+    def nnz(self):
+        return len(self.indices)
+
+    def row_codes(self, row):
+        return self.indices[self.indptr[row]:self.indptr[row + 1]]
+
+    def skills_of(self, row):
+        return list(self.vocabulary[self.row_codes(row)])
+
+    def codes_for(self, skills):
+        """Codes of the given skills that are in the vocabulary."""
+        codes = self.vocabulary.get_indexer(list(skills))
+        return np.unique(codes[codes >= 0]).astype(np.int32)
+
+    def counts(self):
+        """Number of jobs mentioning each skill, most frequent first."""
+        counts = pd.Series(
+            np.bincount(self.indices, minlength=self.n_skills),
+            index=self.vocabulary, name='count'
+        )
+        counts.index.name = 'Skills'
+        return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+    def _nnz_rows(self):
+        # Row id of every stored entry, built lazily
+        if self._rows is None:
+            self._rows = np.repeat(np.arange(self.n_jobs, dtype=np.int64), np.diff(self.indptr))
+        return self._rows
+
+    def _column_layout(self):
+        # CSC view (jobs per skill), built lazily on first filter
+        if self._columns is None:
+            order = np.argsort(self.indices, kind='stable')
+            col_ptr = np.zeros(self.n_skills + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=self.n_skills), out=col_ptr[1:])
+            self._columns = (col_ptr, self._nnz_rows()[order])
+        return self._columns
+
+    def jobs_with(self, code):
+        col_ptr, col_rows = self._column_layout()
+        return col_rows[col_ptr[code]:col_ptr[code + 1]]
+
+    def jobs_with_any(self, skills):
+        """Sorted row ids of jobs that list at least one of the skills."""
+        codes = self.codes_for(skills)
+        if not len(codes):
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate([self.jobs_with(c) for c in codes]))
+
+    def overlap(self, skills):
+        """Number of the given skills each job lists, in one O(nnz) pass."""
+        mask = np.zeros(self.n_skills, dtype=bool)
+        mask[self.codes_for(skills)] = True
+        hits = np.bincount(self._nnz_rows(), weights=mask[self.indices], minlength=self.n_jobs)
+        return hits.astype(np.int64)
+
+    def take(self, rows):
+        """Matrix of the given rows, sharing this vocabulary."""
+        rows = np.asarray(rows, dtype=np.int64)
+        lengths = np.diff(self.indptr)[rows]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        positions = np.repeat(self.indptr[rows] - indptr[:-1], lengths) + np.arange(indptr[-1])
+        return SkillMatrix(self.vocabulary, indptr, self.indices[positions])
+
+    def append(self, skills):
+        """
+        Matrix with rows for the given skill strings appended.  New skills
+        extend the vocabulary, so existing codes stay valid.
+        """
+        other = SkillMatrix.from_series(skills)
+        vocabulary = self.vocabulary.append(other.vocabulary.difference(self.vocabulary, sort=False))
+        codes = vocabulary.get_indexer(other.vocabulary)[other.indices]
+
+        # Remapped codes are re-sorted within each row
+        codes = codes[np.lexsort((codes, other._nnz_rows()))]
+        indptr = np.concatenate([self.indptr, self.indptr[-1] + other.indptr[1:]])
+        indices = np.concatenate([self.indices, codes.astype(np.int32)])
+        return SkillMatrix(vocabulary, indptr, indices)
+
+    def lowercased(self):
+        """
+        Matrix with every skill lowercased, merging skills that differ only in
+        case, derived from the codes without tokenizing the column again.
+        """
+        codes, vocabulary = pd.factorize(self.vocabulary.str.lower())
+        n_skills = max(len(vocabulary), 1)
+        pairs = np.unique(self._nnz_rows() * n_skills + codes[self.indices])
+        rows, codes = np.divmod(pairs, n_skills)
+        indptr = np.zeros(self.n_jobs + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=self.n_jobs), out=indptr[1:])
+        return SkillMatrix(pd.Index(vocabulary, dtype=object), indptr, codes.astype(np.int32))
+
+    def to_csr(self):
+        """The incidence matrix as a scipy.sparse.csr_matrix of ones."""
+        from scipy.sparse import csr_matrix
+        data = np.ones(self.nnz, dtype=np.float32)
+        return csr_matrix((data, self.indices, self.indptr), shape=(self.n_jobs, self.n_skills))
+
+
+# Skill matrices of the most recently used datasets, shared by every session
+skill_matrices = LRUCache(max_entries=8, name='skill_matrices')
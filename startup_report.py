@@ -0,0 +1,115 @@
+"""
+Cold-start report for the Streamlit app.
+
+Measures, each in a fresh interpreter:
+
+* the import time of every module wuzzufAPP.py imports at its top, using
+  python -X importtime, and
+* time to first paint: one run of the script for a new session landing on
+  the upload screen (streamlit itself is already imported by the server, so
+  it is excluded), plus a second, warm rerun.
+
+    python startup_report.py --budget 1.0
+
+The exit status is 1 when the first paint takes longer than the budget.
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(ROOT, 'wuzzufAPP.py')
+
+_FIRST_PAINT_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=120)
+start = time.perf_counter()
+app.run()
+cold = time.perf_counter() - start
+start = time.perf_counter()
+app.run()
+warm = time.perf_counter() - start
+print(json.dumps({'first_paint_seconds': cold, 'rerun_seconds': warm,
+                  'exceptions': [e.value for e in app.exception]}))
+"""
+
+
+def app_imports(path=APP):
+    """Top-level modules imported at the top of the script, in order."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def import_times(modules):
+    """
+    {module: seconds} of cumulative import time for each module, measured in
+    a fresh interpreter.  Modules imported earlier in the list are already
+    loaded when a later one is imported, so each figure is its own extra cost.
+    """
+    code = '; '.join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # Direct imports of the -c code are the entries without indentation
+        if name.startswith(' ') and not name.startswith('  ') and name.strip() in modules:
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def first_paint():
+    result = subprocess.run(
+        [sys.executable, '-c', _FIRST_PAINT_SCRIPT, APP],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the app's import times and time to first paint.")
+    parser.add_argument('--budget', type=float, default=1.0, help="allowed time to first paint in seconds")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args()
+
+    modules = app_imports()
+    report = {
+        'imports': import_times(modules),
+        **first_paint(),
+        'budget_seconds': args.budget,
+    }
+    report['within_budget'] = report['first_paint_seconds'] <= args.budget
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print("Import time of the app's top-level imports (fresh interpreter):")
+        for module, seconds in sorted(report['imports'].items(), key=lambda item: -item[1]):
+            print(f"  {module:<20} {seconds * 1000:8.1f} ms")
+        print(f"  {'total':<20} {sum(report['imports'].values()) * 1000:8.1f} ms")
+        print(f"First paint (upload screen): {report['first_paint_seconds']:.2f}s "
+              f"(budget {args.budget:.2f}s), warm rerun: {report['rerun_seconds']:.2f}s")
+        for exception in report['exceptions']:
+            print(f"  exception while rendering: {exception}")
+
+    if not report['within_budget']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
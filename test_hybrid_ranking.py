@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from hybrid_ranking import HybridRanker
+from job_index import JobIndex
+
+
+def _tied_jobs(n=60):
+    # Few distinct skill strings and embeddings, so most scores tie
+    rng = np.random.default_rng(0)
+    skills = np.array(['python, sql', 'python', 'sql, excel', 'java'])
+    choice = rng.integers(0, len(skills), n)
+    job_data = pd.DataFrame({
+        'Title': [f"job {i}" for i in range(n)],
+        'Skills': skills[choice],
+        'City': np.array(['cairo', 'giza'])[rng.integers(0, 2, n)],
+    })
+    vectors = rng.normal(size=(len(skills), 8)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return job_data, vectors[choice]
+
+
+def _walk_pages(ranker, query_vector, k, **options):
+    rows, page = [], 0
+    while True:
+        page_rows, _, total = ranker.rank(query_vector, 'python, sql', k=k, page=page, **options)
+        if not len(page_rows):
+            return rows, total
+        rows += list(page_rows)
+        page += 1
+
+
+def test_pages_cover_every_candidate_once():
+    job_data, vectors = _tied_jobs()
+    ranker = HybridRanker(job_data, vectors)
+    query_vector = vectors[0]
+    for options in ({}, {'filters': {'City': ['Cairo']}}, {'require_skill_match': False}):
+        everything = ranker.rank(query_vector, 'python, sql', k=len(job_data), **options)[0]
+        for k in (1, 5, 7):
+            rows, total = _walk_pages(ranker, query_vector, k, **options)
+            assert len(rows) == total
+            assert len(set(rows)) == total
+            assert rows == list(everything)
+
+
+def test_unfiltered_queries_use_the_approximate_index():
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(20, 16))
+    vectors = (centers[rng.integers(0, 20, 4000)] + 0.3 * rng.normal(size=(4000, 16))).astype(np.float32)
+    index = JobIndex(vectors, approximate=True, n_lists=40, n_probe=4)
+    job_data = pd.DataFrame({'Title': [f"job {i}" for i in range(4000)], 'Skills': 'excel'})
+    exact = HybridRanker(job_data, index.vectors)
+    approximate = HybridRanker(job_data, index.vectors, index=index)
+
+    query_vector = centers[3] + 0.3 * rng.normal(size=16)
+    rows, _, total = approximate.rank(query_vector, 'python', k=10)
+    expected, _, expected_total = exact.rank(query_vector, 'python', k=10)
+    assert total < expected_total
+    assert len(np.intersect1d(rows, expected)) >= 9
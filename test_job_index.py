@@ -0,0 +1,49 @@
+import numpy as np
+
+from job_index import JobIndex
+
+
+def _clustered(n=4000, dim=32, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    points = centers[rng.integers(0, clusters, n)] + 0.3 * rng.normal(size=(n, dim))
+    queries = centers[rng.integers(0, clusters, 50)] + 0.3 * rng.normal(size=(50, dim))
+    return points.astype(np.float32), queries.astype(np.float32)
+
+
+def _brute_force(points, queries, k):
+    points = points / np.linalg.norm(points, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ points.T
+    return np.argsort(-scores, axis=1, kind='stable')[:, :k], np.sort(scores, axis=1)[:, ::-1][:, :k]
+
+
+def test_exact_search_matches_brute_force_cosine():
+    points, queries = _clustered()
+    index = JobIndex(points, approximate=False)
+    expected_ids, expected_scores = _brute_force(points, queries, 10)
+
+    ids, scores = index.search(queries, k=10)
+    np.testing.assert_array_equal(ids, expected_ids)
+    np.testing.assert_allclose(scores, expected_scores, rtol=1e-5, atol=1e-6)
+
+    single_ids, _ = index.search(queries[0], k=10)
+    np.testing.assert_array_equal(single_ids, expected_ids[0])
+
+
+def test_approximate_search_recall():
+    points, queries = _clustered()
+    index = JobIndex(points, approximate=True, n_lists=40, n_probe=4)
+    assert index.recall(queries, k=10) >= 0.9
+
+    # The exact path of an approximate index is still a full scan
+    ids, _ = index.search(queries, k=10, exact=True)
+    np.testing.assert_array_equal(ids, _brute_force(points, queries, 10)[0])
+
+
+def test_updated_index_keeps_recall():
+    points, queries = _clustered()
+    index = JobIndex(points[:3000], approximate=True, n_lists=40, n_probe=4)
+    updated = index.with_rows(np.arange(500, 3000), points[3000:])
+    np.testing.assert_array_equal(updated.vectors, JobIndex(points[500:], approximate=False).vectors)
+    assert updated.recall(queries, k=10) >= 0.9
@@ -0,0 +1,108 @@
+import csv
+import os
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from wuzzuf_scraper import crawl, parse_jobs
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'wuzzuf_search_page.html')
+
+# Jobs of the fixture page kept by the default location filter
+JOBS_PER_PAGE = 2
+
+
+@pytest.fixture
+def wuzzuf_stand_in():
+    """Local server answering every search page with the saved fixture."""
+    with open(FIXTURE, 'rb') as f:
+        page_html = f.read()
+    requests_seen = Counter()
+    failures = {}  # start -> number of 503 answers before succeeding (-1: always)
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            start = int(parse_qs(urlparse(self.path).query).get('start', ['0'])[0])
+            with lock:
+                requests_seen[start] += 1
+                remaining = failures.get(start, 0)
+                if remaining > 0:
+                    failures[start] = remaining - 1
+            if remaining:
+                self.send_response(503)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(page_html)))
+            self.end_headers()
+            self.wfile.write(page_html)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/search/jobs/", requests_seen, failures
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _crawl(base_url, output, pages, retries=2):
+    return crawl('computer science', pages, str(output), max_workers=2, min_interval=0,
+                 retries=retries, backoff=0.01, base_url=base_url)
+
+
+def _rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_parse_jobs_reads_the_fixture():
+    with open(FIXTURE, encoding='utf-8') as f:
+        jobs = parse_jobs(f.read())
+    assert jobs == [
+        {'Title': 'Backend Developer (Python)', 'Company': 'Acme Software -', 'Location': 'nasr city, cairo, egypt'},
+        {'Title': 'Data Analyst', 'Company': 'Delta Analytics -', 'Location': 'smouha, alexandria, egypt'},
+    ]
+
+
+def test_crawl_retries_a_503(wuzzuf_stand_in, tmp_path):
+    base_url, requests_seen, failures = wuzzuf_stand_in
+    failures[1] = 1
+    output = tmp_path / 'jobs.csv'
+
+    assert _crawl(base_url, output, pages=3) == (3, 0, 0)
+    assert requests_seen == {0: 1, 1: 2, 2: 1}
+    assert len(_rows(output)) == 3 * JOBS_PER_PAGE
+
+
+def test_crawl_streams_rows_of_finished_pages(wuzzuf_stand_in, tmp_path):
+    base_url, requests_seen, failures = wuzzuf_stand_in
+    failures[2] = -1
+    output = tmp_path / 'jobs.csv'
+
+    # The page that keeps failing does not hold back the rows of the others
+    assert _crawl(base_url, output, pages=4, retries=1) == (3, 0, 1)
+    assert requests_seen[2] == 2
+    rows = _rows(output)
+    assert len(rows) == 3 * JOBS_PER_PAGE
+    assert set(rows[0]) == {'Title', 'Company', 'Location'}
+
+
+def test_crawl_resumes_from_checkpoints(wuzzuf_stand_in, tmp_path):
+    base_url, requests_seen, failures = wuzzuf_stand_in
+    output = tmp_path / 'jobs.csv'
+
+    assert _crawl(base_url, output, pages=2) == (2, 0, 0)
+    requests_seen.clear()
+    assert _crawl(base_url, output, pages=4) == (2, 2, 0)
+    assert requests_seen == {2: 1, 3: 1}
+    assert len(_rows(output)) == 4 * JOBS_PER_PAGE
@@ -0,0 +1,202 @@
+"""
+Lightweight tracing of the app's hot paths.
+
+Code wraps its expensive stages in tracer.span("name") and bumps counters with
+tracer.count("name"), e.g. cache hits and encodes performed.  While tracing is
+disabled both are a couple of attribute checks, so the instrumentation can stay
+in place permanently.  When enabled, spans are totalled per name and, on the
+thread running a Streamlit rerun, recorded into that rerun's breakdown.
+
+Tracing is enabled for the whole process by WUZZUF_TRACING=1, or for the
+reruns of a single session from the app's debug panel: that choice is passed
+to start_rerun() and kept per thread, so sessions do not switch it for each
+other.
+
+Each finished rerun is logged as one JSON line on the "wuzzuf.trace" logger
+at INFO level.  WUZZUF_TRACE_LOG names a file those lines are appended to;
+without it the logger needs a handler from the application's logging setup.
+WUZZUF_METRICS_FILE names a file kept up to date with the totals in the
+Prometheus text format.
+"""
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+logger = logging.getLogger('wuzzuf.trace')
+
+TRACING_ENABLED = os.environ.get('WUZZUF_TRACING', '') == '1'
+
+TRACE_LOG_PATH = os.environ.get('WUZZUF_TRACE_LOG') or None
+
+# Shared no-op span: nullcontext keeps no state, so one instance serves all
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'start')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.tracer._local.depth = getattr(self.tracer._local, 'depth', 0) + 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start
+        local = self.tracer._local
+        local.depth -= 1
+        self.tracer._record(self.name, seconds, local.depth, getattr(local, 'rerun', None))
+        return False
+
+
+class Tracer:
+    """
+    Span timers and counters, totalled since start, plus the breakdown of the
+    rerun in progress on each thread.
+    """
+
+    def __init__(self, enabled=False, metrics_path=None):
+        self.enabled = enabled
+        self.metrics_path = metrics_path
+        self._span_seconds = defaultdict(float)
+        self._span_calls = defaultdict(int)
+        self._counters = defaultdict(int)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _active(self):
+        # Enabled for the process, or for the rerun running on this thread
+        return self.enabled or getattr(self._local, 'enabled', False)
+
+    def span(self, name):
+        """Context manager timing the enclosed block under name."""
+        if not self._active():
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def count(self, name, n=1):
+        if not self._active():
+            return
+        with self._lock:
+            self._counters[name] += n
+        rerun = getattr(self._local, 'rerun', None)
+        if rerun is not None:
+            rerun['counters'][name] = rerun['counters'].get(name, 0) + n
+
+    def _record(self, name, seconds, depth, rerun):
+        with self._lock:
+            self._span_seconds[name] += seconds
+            self._span_calls[name] += 1
+        if rerun is not None:
+            rerun['spans'].append({'name': name, 'ms': seconds * 1000, 'depth': depth})
+
+    def start_rerun(self, label, enabled=False):
+        """
+        Start recording the spans of this thread under a new rerun.  enabled
+        turns tracing on for this rerun even when it is off for the process.
+        """
+        self._local.depth = 0
+        self._local.enabled = bool(enabled)
+        if not self._active():
+            self._local.rerun = None
+            return
+        self._local.rerun = {
+            'label': label,
+            'started': time.time(),
+            'start': time.perf_counter(),
+            'spans': [],
+            'counters': {},
+        }
+
+    def end_rerun(self):
+        """
+        Finish the current rerun of this thread and return its record (or
+        None when tracing is disabled), logging it and refreshing the
+        metrics file.
+        """
+        rerun = getattr(self._local, 'rerun', None)
+        self._local.rerun = None
+        self._local.enabled = False
+        if rerun is None:
+            return None
+        rerun['total_ms'] = (time.perf_counter() - rerun.pop('start')) * 1000
+        logger.info(json.dumps(rerun))
+        if self.metrics_path:
+            self.write_prometheus(self.metrics_path)
+        return rerun
+
+    def snapshot(self):
+        """Totals since start: {'spans': {name: {'calls', 'seconds'}}, 'counters': {...}}."""
+        with self._lock:
+            return {
+                'spans': {name: {'calls': self._span_calls[name], 'seconds': seconds}
+                          for name, seconds in self._span_seconds.items()},
+                'counters': dict(self._counters),
+            }
+
+    def prometheus_text(self, prefix='wuzzuf'):
+        totals = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_span_seconds_total Time spent in each traced span.",
+            f"# TYPE {prefix}_span_seconds_total counter",
+        ]
+        lines += [f'{prefix}_span_seconds_total{{span="{name}"}} {span["seconds"]:.6f}'
+                  for name, span in sorted(totals['spans'].items())]
+        lines += [
+            f"# HELP {prefix}_span_calls_total Number of times each span was entered.",
+            f"# TYPE {prefix}_span_calls_total counter",
+        ]
+        lines += [f'{prefix}_span_calls_total{{span="{name}"}} {span["calls"]}'
+                  for name, span in sorted(totals['spans'].items())]
+        lines += [
+            f"# HELP {prefix}_events_total Counted events such as cache hits and encodes.",
+            f"# TYPE {prefix}_events_total counter",
+        ]
+        lines += [f'{prefix}_events_total{{event="{name}"}} {value}'
+                  for name, value in sorted(totals['counters'].items())]
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Write prometheus_text() to path atomically, for a node exporter textfile collector."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.prom.tmp')
+        with os.fdopen(fd, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        with self._lock:
+            self._span_seconds.clear()
+            self._span_calls.clear()
+            self._counters.clear()
+
+
+def log_reruns_to(path):
+    """Append the JSON line of every traced rerun to path."""
+    path = os.path.abspath(path)
+    for handler in logger.handlers:
+        if isinstance(handler, logging.FileHandler) and handler.baseFilename == path:
+            return handler
+    handler = logging.FileHandler(path, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return handler
+
+
+if TRACE_LOG_PATH:
+    log_reruns_to(TRACE_LOG_PATH)
+
+# Shared by every module and session in this process
+tracer = Tracer(
+    enabled=TRACING_ENABLED,
+    metrics_path=os.environ.get('WUZZUF_METRICS_FILE') or None,
+)
@@ -1,16 +1,18 @@
 import pandas as pd
-import numpy as np
 import streamlit as st
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-import time
-import io
-import matplotlib.pyplot as plt
-import seaborn as sns
-from collections import Counter
-from wordcloud import WordCloud
-import re
-import plotly.express as px
+import json
+from collections import deque
+from model_registry import registry, DEFAULT_MODEL_NAME
+from recommender import get_engine, warm_engine_async
+from hybrid_ranking import filter_options, filter_options_cache
+from job_data import JobDataError, dataset_key, datasets as dataset_cache
+from job_stats import build_aggregates, aggregates_cache
+from skill_vocab import SkillMatrix, skill_matrices
+from skill_cooccurrence import SkillCooccurrence, cooccurrence_cache
+from job_ingest import live_dataset
+import charts
+from charts import figures as chart_cache
+from tracing import tracer
 
 # Streamlit page setup
 st.set_page_config(
@@ -120,32 +122,49 @@ st.markdown(page_bg_img, unsafe_allow_html=True)
 if "page" not in st.session_state:
     st.session_state.page = "home"
 
+# Span timings of this rerun, shown in the optional sidebar debug panel
+tracer.start_rerun(st.session_state.page, enabled=st.session_state.get("debug_panel", False))
+
+# The live dataset's (key, job_data), taken together once per rerun, so a merge
+# from another session cannot mix two versions within one rerun
+st.session_state.live_snapshot = None
+
+def live_snapshot():
+    if st.session_state.live_snapshot is None:
+        st.session_state.live_snapshot = live_dataset.publish()
+    return st.session_state.live_snapshot
+
+# True when this session works on the incrementally maintained live dataset
+def using_live_dataset():
+    return st.session_state.get("use_live_dataset", False) and live_snapshot()[0] is not None
+
+# Content-hash key of the uploaded file, hashed once per upload rather than per rerun
+def current_dataset_key():
+    if using_live_dataset():
+        return live_snapshot()[0]
+    file = st.session_state.scraped_file
+    file_id = getattr(file, 'file_id', None) or id(file)
+    cached = st.session_state.get("dataset_key")
+    if cached is None or cached[0] != file_id:
+        cached = (file_id, dataset_key(file.name, file.getvalue()))
+        st.session_state.dataset_key = cached
+    return cached[1]
+
 # Function to load job data from session_state
 def load_job_data():
     if "scraped_file" in st.session_state and st.session_state.scraped_file is not None:
         try:
-            file = st.session_state.scraped_file
-            file_content = file.read()
-            file.seek(0)
-            if file.name.endswith('.csv'):
-                job_data = pd.read_csv(io.BytesIO(file_content))
-            elif file.name.endswith('.xlsx'):
-                job_data = pd.read_excel(io.BytesIO(file_content))
-            else:
-                st.error("⚠️ Unsupported file format. Please upload a CSV or XLSX file.")
-                return None
-
-            if 'Skills' not in job_data.columns:
-                st.error("⚠️ The uploaded file must contain a 'Skills' column.")
-                return None
+            with tracer.span('load_job_data'):
+                if using_live_dataset():
+                    return live_snapshot()[1].copy(deep=False)
 
-            if job_data.empty:
-                st.error("⚠️ The uploaded file is empty.")
-                return None
-
-            job_data['Skills'] = job_data['Skills'].apply(lambda x: [s.strip() for s in str(x).split(',') if s.strip()])
-            return job_data
+                # Parsed once per file content and shared across reruns and sessions
+                file = st.session_state.scraped_file
+                return dataset_cache.load(file.name, file.getvalue(), key=current_dataset_key())
 
+        except JobDataError as e:
+            st.error(f"⚠️ {e}")
+            return None
         except Exception as e:
             st.error(f"⚠️ Error reading the file: {e}")
             return None
@@ -153,6 +172,30 @@ def load_job_data():
         st.warning("⚠️ Please upload the job data file first.")
         return None
 
+# Merge an uploaded scrape into the live dataset, once per uploaded file
+def merge_into_live_dataset(file):
+    file_id = getattr(file, 'file_id', None) or id(file)
+    if st.session_state.get("merged_file_id") == file_id:
+        return
+    try:
+        snapshot = dataset_cache.load(file.name, file.getvalue())
+    except JobDataError as e:
+        st.error(f"⚠️ {e}")
+        return
+    except Exception as e:
+        st.error(f"⚠️ Error reading the file: {e}")
+        return
+
+    with st.spinner("Merging new postings into the live dataset..."):
+        report = live_dataset.ingest(snapshot, registry.get())
+    st.session_state.merged_file_id = file_id
+    # The rest of this rerun uses the merged version
+    st.session_state.live_snapshot = None
+    st.success(
+        f"✅ Live dataset updated: {report['added']} new, {report['changed']} changed and "
+        f"{report['expired']} expired postings ({report['encoded']} skill sets encoded)"
+    )
+
 # Main page of the app (unchanged)
 def main_page():
     st.markdown("<div class='content-container'>", unsafe_allow_html=True)
@@ -187,18 +230,25 @@ def main_page():
     with col1:
         uploaded_scraped_file = st.file_uploader(
             "Collected Data from Wuzzuf (required)", 
-            type=["csv", "xlsx"], 
+            type=["csv", "xlsx", "arrow", "feather", "parquet"], 
             key="main_data_uploader"
         )
+        incremental = st.checkbox(
+            "➕ Merge into the live dataset (daily incremental update)",
+            key="incremental_upload"
+        )
         if uploaded_scraped_file is not None:
             st.session_state.scraped_file = uploaded_scraped_file
+            st.session_state.use_live_dataset = incremental
+            if incremental:
+                merge_into_live_dataset(uploaded_scraped_file)
         elif "scraped_file" in st.session_state:
             st.success(f"✅ File already uploaded: {st.session_state.scraped_file.name}")
 
     with col2:
         uploaded_additional_file = st.file_uploader(
             "Additional Data (optional)", 
-            type=["csv", "xlsx"], 
+            type=["csv", "xlsx", "arrow", "feather", "parquet"], 
             key="additional_data_uploader"
         )
         if uploaded_additional_file is not None:
@@ -256,164 +306,145 @@ def visualization_page():
     if job_data is None:
         return
 
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
-        "🏢 Top Companies", "💼 Top Job Titles", "📍 Top Cities", 
-        "🛠️ Top Skills", "📊 Word Cloud", "📈 Top Regions", "🥧 Pie Charts"
-    ])
+    # Full frequency tables are built once per dataset; the slider only slices them
+    with tracer.span('aggregates'):
+        skill_matrix = skill_matrices.get_or_build(current_dataset_key(), lambda: SkillMatrix.from_series(job_data['Skills']))
+        aggregates = aggregates_cache.get_or_build(current_dataset_key(), lambda: build_aggregates(job_data, skill_matrix))
+
+    # Only the selected view is rendered; charts are cached as PNG/JSON per dataset and size
+    selected_tab = st.radio(
+        "View:",
+        ["🏢 Top Companies", "💼 Top Job Titles", "📍 Top Cities",
+         "🛠️ Top Skills", "📊 Word Cloud", "📈 Top Regions", "🥧 Pie Charts"],
+        horizontal=True, label_visibility="collapsed", key="viz_tab"
+    )
 
     num_items = st.slider(
         "🔢 Number of items to display:",
         min_value=5, max_value=20, value=10, key="viz_slider"
     )
 
-    with tab1:
+    dataset = current_dataset_key()
+
+    if selected_tab == "🏢 Top Companies":
         st.header("Top Companies Hiring")
-        top_companies = job_data['Company'].value_counts().head(num_items)
-        fig1, ax1 = plt.subplots(figsize=(6,4))
-        sns.barplot(x=top_companies.values, y=top_companies.index, palette='BuPu', ax=ax1)
-        ax1.set_xlabel('Number of Jobs')
-        ax1.set_ylabel('Company')
-        ax1.set_title(f'Top {num_items} Hiring Companies')
-        st.pyplot(fig1)
-        with st.expander("View Raw Data"):
-            st.dataframe(top_companies.reset_index().rename(columns={'index': 'Company', 0: 'Count'}))
-    
-    with tab2:
+        if aggregates['companies'] is None:
+            st.warning("Company column not found in the dataset!")
+        else:
+            top_companies = aggregates['companies'].head(num_items)
+            st.image(chart_cache.get_or_build((dataset, 'companies', num_items), lambda: charts.bar_chart_png(
+                top_companies, 'BuPu', 'Number of Jobs', 'Company', f'Top {num_items} Hiring Companies'
+            )), width='stretch')
+            with st.expander("View Raw Data"):
+                st.dataframe(top_companies.reset_index().rename(columns={'index': 'Company', 0: 'Count'}))
+
+    elif selected_tab == "💼 Top Job Titles":
         st.header("Most Popular Job Titles")
-        top_titles = job_data['Title'].value_counts().head(num_items)
-        fig2, ax2 = plt.subplots(figsize=(6,4))
-        sns.barplot(x=top_titles.values, y=top_titles.index, palette='BuPu', ax=ax2)
-        ax2.set_xlabel('Number of Jobs')
-        ax2.set_ylabel('Job Title')
-        ax2.set_title(f'Top {num_items} Job Titles')
-        st.pyplot(fig2)
-        with st.expander("View Raw Data"):
-            st.dataframe(top_titles.reset_index().rename(columns={'index': 'Job Title', 0: 'Count'}))
-
-    with tab3:
+        if aggregates['titles'] is None:
+            st.warning("Title column not found in the dataset!")
+        else:
+            top_titles = aggregates['titles'].head(num_items)
+            st.image(chart_cache.get_or_build((dataset, 'titles', num_items), lambda: charts.bar_chart_png(
+                top_titles, 'BuPu', 'Number of Jobs', 'Job Title', f'Top {num_items} Job Titles'
+            )), width='stretch')
+            with st.expander("View Raw Data"):
+                st.dataframe(top_titles.reset_index().rename(columns={'index': 'Job Title', 0: 'Count'}))
+
+    elif selected_tab == "📍 Top Cities":
         st.header("Most Popular Cities")
-        if 'City' not in job_data.columns:
+        if aggregates['cities'] is None:
             st.warning("City column not found in the dataset!")
         else:
-            cities = job_data['City'].astype(str).replace('nan', '').str.strip()
-            cities = cities[cities != '']
-            if not cities.empty:
-                top_locations = cities.value_counts().head(num_items)
-                fig3, ax3 = plt.subplots(figsize=(6,4))
-                sns.barplot(x=top_locations.values, y=top_locations.index, palette='viridis', ax=ax3)
-                ax3.set_xlabel('Number of Jobs')
-                ax3.set_ylabel('City')
-                ax3.set_title(f'Top {num_items} Cities')
-                st.pyplot(fig3)
+            if not aggregates['cities'].empty:
+                top_locations = aggregates['cities'].head(num_items)
+                st.image(chart_cache.get_or_build((dataset, 'cities', num_items), lambda: charts.bar_chart_png(
+                    top_locations, 'viridis', 'Number of Jobs', 'City', f'Top {num_items} Cities'
+                )), width='stretch')
                 with st.expander("View Raw Data"):
                     st.dataframe(top_locations.reset_index().rename(columns={'index': 'City', 0: 'Count'}))
             else:
                 st.warning("No valid city data found after cleaning!")
 
-    with tab4:
+    elif selected_tab == "🛠️ Top Skills":
         st.header("Most Important Skills")
-        if 'Skills' not in job_data.columns:
+        if aggregates['skills'] is None:
             st.warning("Skills column not found in the dataset!")
         else:
-            skills = job_data['Skills'].astype(str).replace('nan', '').str.split(',').explode()
-            skills = skills.str.strip()
-            skills = skills[skills != '']
-            if not skills.empty:
-                top_skills = skills.value_counts().head(num_items)
-                fig4, ax4 = plt.subplots(figsize=(6,4))
-                sns.barplot(x=top_skills.values, y=top_skills.index, palette='viridis', ax=ax4)
-                ax4.set_xlabel('Count')
-                ax4.set_ylabel('Skill')
-                ax4.set_title(f'Top {num_items} Skills in Demand')
-                st.pyplot(fig4)
+            if not aggregates['skills'].empty:
+                top_skills = aggregates['skills'].head(num_items)
+                st.image(chart_cache.get_or_build((dataset, 'skills', num_items), lambda: charts.bar_chart_png(
+                    top_skills, 'viridis', 'Count', 'Skill', f'Top {num_items} Skills in Demand'
+                )), width='stretch')
                 with st.expander("View Raw Data"):
                     st.dataframe(top_skills.reset_index().rename(columns={'index': 'Skill', 0: 'Count'}))
+
+                # Partners come from the per-dataset co-occurrence lists, built once
+                selected_skill = st.selectbox("🔗 Skills most often listed together with:", list(top_skills.index),
+                                              key="cooccurrence_skill")
+                with tracer.span('skill_cooccurrence'):
+                    cooccurrence = cooccurrence_cache.get_or_build(
+                        dataset, lambda: SkillCooccurrence(skill_matrix.lowercased())
+                    )
+                    partners = cooccurrence.neighbors(selected_skill, num_items)
+                st.dataframe(partners.rename(columns={'skill': 'Skill', 'jobs': 'Jobs together', 'pmi': 'PMI'}),
+                             width='stretch')
             else:
                 st.warning("No valid skills found after cleaning!")
 
-    with tab5:
+    elif selected_tab == "📊 Word Cloud":
         st.header("Word Cloud of Job Titles")
-        if 'Title' not in job_data.columns:
+        if aggregates['title_text'] is None:
             st.warning("Title column not found in the dataset!")
         else:
-            titles = job_data['Title'].astype(str).replace('nan', '')
-            if not titles.empty:
-                titles_cleaned = titles.str.lower().apply(lambda x: re.sub(r'[^a-zA-Z0-9\s]', '', x))
-                text = ' '.join(titles_cleaned)
-                wordcloud = WordCloud(
-                    width=1000, height=500, background_color='white',
-                    stopwords=set(['and', 'with', 'for', 'to', 'in', 'of', 'on', 'a', 'an', 'the']),
-                    colormap='magma', max_words=100
-                ).generate(text)
-                fig5, ax5 = plt.subplots(figsize=(12, 6))
-                ax5.imshow(wordcloud, interpolation='bilinear')
-                ax5.axis('off')
-                ax5.set_title('Most Common Words in Job Titles', fontsize=20)
-                st.pyplot(fig5)
+            text = aggregates['title_text']
+            if text.strip():
+                # Independent of the slider, so rendered once per dataset
+                st.image(chart_cache.get_or_build((dataset, 'word_cloud', None), lambda: charts.word_cloud_png(text)),
+                         width='stretch')
             else:
                 st.warning("No valid titles found for word cloud!")
 
-    with tab6:
+    elif selected_tab == "📈 Top Regions":
         st.header("Top Regions by Unique Companies")
-        if 'Region' not in job_data.columns or 'Company' not in job_data.columns:
+        if aggregates['region_companies'] is None:
             st.warning("Required columns (Region/Company) not found!")
         else:
-            regions = job_data[['Region', 'Company']].dropna()
-            regions['Region'] = regions['Region'].astype(str).str.strip()
-            regions = regions[regions['Region'] != '']
-            if not regions.empty:
-                top_regions = regions.groupby('Region')['Company'].nunique().sort_values(ascending=False).head(num_items)
+            if not aggregates['region_companies'].empty:
+                top_regions = aggregates['region_companies'].head(num_items)
                 top_regions_df = top_regions.reset_index()
                 top_regions_df.columns = ['Region', 'Unique Companies']
-                fig6 = px.bar(
-                    top_regions_df, x='Region', y='Unique Companies',
-                    title=f'Top {num_items} Regions by Unique Companies',
-                    color='Unique Companies', text='Unique Companies'
-                )
+                fig6 = charts.figure_from_json(chart_cache.get_or_build(
+                    (dataset, 'regions', num_items), lambda: charts.region_bar_json(top_regions_df, num_items)
+                ))
                 st.plotly_chart(fig6)
                 with st.expander("View Raw Data"):
                     st.dataframe(top_regions_df)
             else:
                 st.warning("No valid region data found after cleaning!")
 
-    with tab7:
+    elif selected_tab == "🥧 Pie Charts":
         st.header("Top Cities Analysis")
-        if 'City' not in job_data.columns or 'Company' not in job_data.columns:
+        if aggregates['city_companies'] is None:
             st.warning("Required columns (City/Company) not found!")
         else:
-            cities = job_data[['City', 'Company']].dropna()
-            cities['City'] = cities['City'].astype(str).str.strip()
-            cities = cities[cities['City'] != '']
-            if not cities.empty:
+            if not aggregates['city_postings'].empty:
                 col1, col2 = st.columns(2)
                 with col1:
                     st.subheader("Job Postings Distribution")
-                    top_cities = cities['City'].value_counts().head(3)
+                    top_cities = aggregates['city_postings'].head(3)
                     if not top_cities.empty:
-                        fig7a, ax7a = plt.subplots(figsize=(8,8))
-                        ax7a.pie(
-                            top_cities, labels=top_cities.index,
-                            autopct='%1.1f%%', startangle=90,
-                            colors=sns.color_palette('coolwarm', len(top_cities)),
-                            explode=[0.1]*len(top_cities), shadow=True
-                        )
-                        ax7a.set_title('Top 3 Cities by Job Postings', fontsize=14)
-                        st.pyplot(fig7a)
+                        st.image(chart_cache.get_or_build((dataset, 'city_postings_pie', None), lambda: charts.pie_chart_png(
+                            top_cities, 'Top 3 Cities by Job Postings'
+                        )), width='stretch')
                     else:
                         st.warning("No city data available for pie chart")
                 with col2:
                     st.subheader("Companies Distribution")
-                    company_counts = cities.groupby('City')['Company'].nunique().sort_values(ascending=False).head(3)
+                    company_counts = aggregates['city_companies'].head(3)
                     if not company_counts.empty:
-                        fig7b, ax7b = plt.subplots(figsize=(8,8))
-                        ax7b.pie(
-                            company_counts, labels=company_counts.index,
-                            autopct='%1.1f%%', startangle=90,
-                            colors=sns.color_palette('coolwarm', len(company_counts)),
-                            explode=[0.1]*len(company_counts), shadow=True
-                        )
-                        ax7b.set_title('Top 3 Cities by Unique Companies', fontsize=14)
-                        st.pyplot(fig7b)
+                        st.image(chart_cache.get_or_build((dataset, 'city_companies_pie', None), lambda: charts.pie_chart_png(
+                            company_counts, 'Top 3 Cities by Unique Companies'
+                        )), width='stretch')
                     else:
                         st.warning("No company data available for pie chart")
             else:
@@ -457,26 +488,91 @@ def recommender_page():
 
     user_input = st.text_input("✍️ Enter your skills separated by commas (e.g. Python, SQL, Machine Learning):")
 
+    # Structured filters and ranking options, offered for the columns the dataset has
+    options = filter_options_cache.get_or_build(current_dataset_key(), lambda: filter_options(job_data))
+    with st.expander("🔎 Filters and ranking"):
+        filters = {}
+        for column, filter_col in zip(options, st.columns(max(len(options), 1))):
+            selected = filter_col.multiselect(column, options[column], key=f"filter_{column}")
+            if selected:
+                filters[column] = selected
+        per_page = st.select_slider("Results per page", options=[5, 10, 20, 50], value=5, key="results_per_page")
+        lexical_weight = st.slider("Weight of exact skill matches (vs. semantic similarity)",
+                                   min_value=0.0, max_value=1.0, value=0.3, step=0.05, key="lexical_weight")
+
+    if st.session_state.get("cancel_embedding"):
+        st.session_state.recommend_query = None
+
     if user_input:
         if st.button("🚀 Get Recommendations"):
+            # Kept so that changing filters or the page refreshes the results
+            st.session_state.recommend_query = user_input
+            st.session_state.results_page = 1
+        if st.session_state.get("recommend_query") == user_input:
             with st.spinner("Analyzing your skills and matching with jobs..."):
-                model = SentenceTransformer('all-MiniLM-L6-v2')
-                user_skills = [s.strip() for s in user_input.split(',')]
-                user_embedding = model.encode(', '.join(user_skills))
-
-                if 'embedding' not in job_data.columns:
-                    st.info("🧠 Calculating embeddings for the job data based on skills...")
-                    job_data['embedding'] = job_data['Skills'].apply(lambda x: model.encode(', '.join(x)))
-
-                similarities = cosine_similarity([user_embedding], np.stack(job_data['embedding'])).flatten()
-                job_data['similarity'] = similarities
-                top_jobs = job_data.sort_values('similarity', ascending=False).head(5)
-
-                st.success("🎯 Top 5 Jobs Matching Your Skills:")
-                styled_df = top_jobs[['Title', 'Company', 'Skills', 'similarity']].copy()
-                styled_df['Skills'] = styled_df['Skills'].apply(lambda s: ', '.join(s))
-                styled_df['similarity'] = styled_df['similarity'].apply(lambda s: f"{s:.2f}")
-                st.dataframe(styled_df.reset_index(drop=True), use_container_width=True)
+                progress_area = st.empty()
+                cancel_area = st.empty()
+                cancel_shown = []
+
+                def show_progress(done, total):
+                    if not cancel_shown:
+                        # Clicking it reruns the page, which interrupts the build and stops its workers
+                        cancel_area.button("⏹️ Cancel embedding", key="cancel_embedding")
+                        cancel_shown.append(True)
+                    progress_area.progress(done / total, text=f"🧠 Embedded {done:,} of {total:,} unique skill sets")
+
+                # Shared per-dataset engine: stored embeddings and index are reused across clicks
+                with tracer.span('get_engine'):
+                    engine = get_engine(current_dataset_key(), job_data, DEFAULT_MODEL_NAME,
+                                        notify=st.info, progress=show_progress)
+                progress_area.empty()
+                cancel_area.empty()
+                page = st.session_state.get("results_page", 1)
+                with tracer.span('recommend'):
+                    top_jobs, total = engine.search(user_input, filters, k=per_page, page=page - 1,
+                                                    lexical_weight=lexical_weight)
+                    if top_jobs.empty and total > 0:
+                        # Narrower filters left fewer pages: show the last one
+                        page = st.session_state.results_page = -(-total // per_page)
+                        top_jobs, total = engine.search(user_input, filters, k=per_page, page=page - 1,
+                                                        lexical_weight=lexical_weight)
+
+                if total == 0:
+                    st.warning("No jobs match the selected filters.")
+                else:
+                    first = (page - 1) * per_page
+                    st.success(f"🎯 Jobs {first + 1}-{first + len(top_jobs)} of {total} Matching Your Skills:")
+                    columns = ['Title', 'Company'] + list(filters) + ['Skills', 'similarity', 'skill_match', 'score']
+                    styled_df = top_jobs[columns].copy()
+                    for column in ['similarity', 'skill_match', 'score']:
+                        styled_df[column] = styled_df[column].apply(lambda s: f"{s:.2f}")
+                    st.dataframe(styled_df.reset_index(drop=True), width='stretch')
+                    st.number_input("Page", min_value=1, max_value=-(-total // per_page), step=1, key="results_page")
+
+                    # Skills gap within the jobs passing the filters (all jobs when there are none)
+                    with tracer.span('skill_cooccurrence'):
+                        # Reuses the ranker's lowercased skill matrix
+                        cooccurrence = cooccurrence_cache.get_or_build(
+                            current_dataset_key(), lambda: SkillCooccurrence(engine.ranker.skills)
+                        )
+                        rows = engine.ranker.candidates(filters)
+                        related = cooccurrence.related_skills(user_input, rows)
+                        unlocking, within_reach = cooccurrence.unlocking_skills(user_input, rows)
+                    related_col, unlocking_col = st.columns(2)
+                    with related_col:
+                        st.subheader("🔗 Often listed with your skills")
+                        st.dataframe(related.rename(columns={'skill': 'Skill', 'jobs': 'Jobs', 'pmi': 'PMI'}),
+                                     width='stretch')
+                    with unlocking_col:
+                        st.subheader("🔓 Skills that unlock the most postings")
+                        st.caption(f"You already cover at least half the skills of {within_reach:,} postings.")
+                        st.dataframe(unlocking.rename(columns={'skill': 'Skill', 'postings': 'New postings'}),
+                                     width='stretch')
+
+                model_stats = registry.stats()
+                if model_stats is not None:
+                    memory_mb = (model_stats['memory_bytes'] or 0) / 1e6
+                    st.caption(f"Model {model_stats['model']} loaded in {model_stats['load_seconds']:.1f}s ({memory_mb:.0f} MB)")
 
     if st.button("🔙 Back to Home"):
         st.session_state.page = "home"
@@ -492,10 +588,62 @@ def recommender_page():
           </div>
           """, unsafe_allow_html=True)
 
+# Sidebar panel with the span timings and counters of this session's last reruns
+def debug_panel(history):
+    if not history:
+        st.caption("Timings are recorded from the next interaction on.")
+        return
+
+    rows = []
+    for rerun in reversed(history):
+        row = {'page': rerun['label'], 'total ms': round(rerun['total_ms'], 1)}
+        for span in rerun['spans']:
+            row[span['name']] = round(row.get(span['name'], 0) + span['ms'], 1)
+        rows.append(row)
+    st.dataframe(pd.DataFrame(rows).fillna(0), width='stretch')
+
+    latest = history[-1]
+    st.markdown("**Last rerun** (nested spans are indented, and listed before their parent)")
+    st.text('\n'.join(f"{'  ' * span['depth']}{span['name']}: {span['ms']:.1f} ms" for span in latest['spans']))
+    if latest['counters']:
+        st.json(latest['counters'])
+
+    st.download_button("⬇️ Prometheus metrics", tracer.prometheus_text(), file_name="wuzzuf_metrics.prom")
+    st.download_button("⬇️ Rerun log (JSON lines)", '\n'.join(json.dumps(r) for r in history),
+                       file_name="wuzzuf_reruns.jsonl")
+
 # Page navigation control
-if st.session_state.page == "home":
-    main_page()
-elif st.session_state.page == "visualization":
-    visualization_page() 
-elif st.session_state.page == "recommender":
-    recommender_page()
+with tracer.span(f"page.{st.session_state.page}"):
+    if st.session_state.page == "home":
+        main_page()
+    elif st.session_state.page == "visualization":
+        visualization_page() 
+    elif st.session_state.page == "recommender":
+        recommender_page()
+
+rerun = tracer.end_rerun()
+if rerun is not None:
+    st.session_state.setdefault("trace_history", deque(maxlen=10)).append(rerun)
+
+with st.sidebar:
+    if st.checkbox("🛠️ Performance debug panel", key="debug_panel"):
+        debug_panel(list(st.session_state.get("trace_history", [])))
+
+# Build the uploaded dataset's recommendation engine in the background
+def prewarm_dataset():
+    if st.session_state.get("scraped_file") is None:
+        return
+    key = current_dataset_key()
+    if using_live_dataset():
+        job_data = live_snapshot()[1]
+        warm_engine_async(key, lambda: job_data, DEFAULT_MODEL_NAME)
+    else:
+        file = st.session_state.scraped_file
+        content = file.getvalue()
+        warm_engine_async(key, lambda: dataset_cache.load(file.name, content, key=key), DEFAULT_MODEL_NAME)
+
+# Warm-up starts only after the page has been painted: the plotting libraries,
+# the embedding model and the current dataset's engine load in background threads
+charts.warm_up_async()
+registry.warm_up_async()
+prewarm_dataset()
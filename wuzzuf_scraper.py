@@ -0,0 +1,238 @@
+"""
+Wuzzuf job scraper.
+
+Fetches search result pages concurrently through a pooled HTTP session, with a
+bounded number of workers, a politeness rate limit shared by all workers and
+retries with exponential backoff.  Every finished page is appended to the
+output CSV and recorded as a checkpoint file, so an interrupted crawl resumes
+where it stopped.
+
+Usage:
+    python wuzzuf_scraper.py "computer science" "data analyst" --pages 30 --output scraping_Data.csv
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote
+
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://wuzzuf.net/search/jobs/"
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+FIELDS = ['Title', 'Company', 'Location']
+
+# Responses worth retrying: rate limiting and server-side errors
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """Spaces requests at least min_interval seconds apart across all threads."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def search_url(search_term, page, base_url=BASE_URL):
+    url = f"{base_url}?a=hpb&q={quote(search_term)}"
+    return f"{url}&start={page}" if page > 0 else url
+
+
+def parse_jobs(html, location="egypt"):
+    """
+    Extract title, company and location from a search results page, keeping
+    only jobs located in the given country (or Cairo).
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    jobs = []
+    for job in soup.find_all('div', class_='css-1gatmva'):
+        try:
+            title = job.find('h2', class_='css-m604qf').text.strip()
+            company = job.find('a', class_='css-17s97q8').text.strip()
+            location_text = job.find('span', class_='css-5wys0k').text.strip().lower()
+        except AttributeError as e:
+            logger.warning("Error processing job card: %s", e)
+            continue
+
+        if location not in location_text and 'cairo' not in location_text:
+            continue
+
+        jobs.append({'Title': title, 'Company': company, 'Location': location_text})
+    return jobs
+
+
+def make_session(pool_size):
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def fetch_page(session, url, rate_limiter, retries=3, backoff=1.0, timeout=10):
+    """GET a page, retrying connection errors and retryable statuses with backoff."""
+    for attempt in range(retries + 1):
+        rate_limiter.wait()
+        try:
+            response = session.get(url, timeout=timeout)
+            if response.status_code not in RETRY_STATUS:
+                response.raise_for_status()
+                return response.text
+            error = requests.HTTPError(f"{response.status_code} for {url}", response=response)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+
+        if attempt == retries:
+            raise error
+        delay = backoff * 2 ** attempt * (1 + random.random())
+        logger.info("Retrying %s in %.1fs (%s)", url, delay, error)
+        time.sleep(delay)
+
+
+class CheckpointedCrawl:
+    """
+    Checkpoint files and output CSV of one crawl.  A page's checkpoint holds
+    its parsed jobs and is written right after the jobs are appended to the
+    CSV, so pages with a checkpoint are skipped when the crawl resumes.
+    """
+
+    def __init__(self, output_path, checkpoint_dir):
+        self.output_path = output_path
+        self.checkpoint_dir = checkpoint_dir
+        self._lock = threading.Lock()
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    def _checkpoint_path(self, search_term, page):
+        slug = re.sub(r'[^a-z0-9]+', '-', search_term.lower()).strip('-')
+        return os.path.join(self.checkpoint_dir, f"{slug}-page-{page:04d}.json")
+
+    def is_done(self, search_term, page):
+        return os.path.exists(self._checkpoint_path(search_term, page))
+
+    def load(self, search_term, page):
+        with open(self._checkpoint_path(search_term, page), encoding='utf-8') as f:
+            return json.load(f)
+
+    def record(self, search_term, page, jobs):
+        with self._lock:
+            write_header = not os.path.exists(self.output_path) or os.path.getsize(self.output_path) == 0
+            with open(self.output_path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                if write_header:
+                    writer.writeheader()
+                writer.writerows(jobs)
+
+            # Atomic rename, so a crash never leaves a half-written checkpoint
+            fd, tmp_path = tempfile.mkstemp(dir=self.checkpoint_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(jobs, f, ensure_ascii=False)
+            os.replace(tmp_path, self._checkpoint_path(search_term, page))
+
+
+def crawl(search_terms, pages=30, output_path='scraping_Data.csv', checkpoint_dir=None,
+          location="egypt", max_workers=4, min_interval=2.0, retries=3, backoff=1.0,
+          base_url=BASE_URL):
+    """
+    Scrape pages 0..pages-1 of every search term into output_path.
+
+    At most max_workers requests are in flight and requests start at least
+    min_interval seconds apart.  Pages that already have a checkpoint are not
+    fetched again.  Returns (pages fetched, pages skipped, pages failed).
+    """
+    if isinstance(search_terms, str):
+        search_terms = [search_terms]
+    checkpoint_dir = checkpoint_dir or f"{os.path.splitext(output_path)[0]}_checkpoints"
+    crawl_state = CheckpointedCrawl(output_path, checkpoint_dir)
+    rate_limiter = RateLimiter(min_interval)
+
+    todo = [(term, page) for term in search_terms for page in range(pages)
+            if not crawl_state.is_done(term, page)]
+    skipped = len(search_terms) * pages - len(todo)
+    fetched = failed = 0
+
+    def scrape_page(session, term, page):
+        html = fetch_page(session, search_url(term, page, base_url), rate_limiter, retries, backoff)
+        crawl_state.record(term, page, parse_jobs(html, location))
+
+    with make_session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(scrape_page, session, term, page): (term, page) for term, page in todo}
+        for future in as_completed(futures):
+            term, page = futures[future]
+            try:
+                future.result()
+                fetched += 1
+            except requests.RequestException as e:
+                failed += 1
+                logger.error("Error scraping %r page %d: %s", term, page + 1, e)
+
+    logger.info("Fetched %d pages, skipped %d already done, %d failed", fetched, skipped, failed)
+    return fetched, skipped, failed
+
+
+def scrape_wuzzuf_jobs(search_term="computer science", location="egypt", pages=30,
+                       output_path='scraping_Data.csv', **crawl_options):
+    """
+    Scrape job listings from Wuzzuf (only title, company, and location) and
+    return the jobs of this search term as a DataFrame, in page order.
+    """
+    crawl(search_term, pages, output_path, location=location, **crawl_options)
+    checkpoint_dir = crawl_options.get('checkpoint_dir') or f"{os.path.splitext(output_path)[0]}_checkpoints"
+    crawl_state = CheckpointedCrawl(output_path, checkpoint_dir)
+    all_jobs = []
+    for page in range(pages):
+        if crawl_state.is_done(search_term, page):
+            all_jobs.extend(crawl_state.load(search_term, page))
+    return pd.DataFrame(all_jobs, columns=FIELDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape Wuzzuf job search results to CSV.")
+    parser.add_argument('search_terms', nargs='+', help="one or more search terms")
+    parser.add_argument('--pages', type=int, default=30, help="result pages per search term")
+    parser.add_argument('--output', default='scraping_Data.csv', help="CSV file to append jobs to")
+    parser.add_argument('--checkpoint-dir', help="where per-page checkpoints are kept")
+    parser.add_argument('--location', default='egypt', help="keep only jobs located here")
+    parser.add_argument('--workers', type=int, default=4, help="maximum concurrent requests")
+    parser.add_argument('--delay', type=float, default=2.0, help="minimum seconds between requests")
+    parser.add_argument('--retries', type=int, default=3, help="retries per page")
+    parser.add_argument('--base-url', default=BASE_URL, help="search endpoint (e.g. a local test server)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    fetched, skipped, failed = crawl(
+        args.search_terms, args.pages, args.output, args.checkpoint_dir, args.location,
+        max_workers=args.workers, min_interval=args.delay, retries=args.retries,
+        base_url=args.base_url
+    )
+    print(f"Scraped {fetched} pages ({skipped} resumed from checkpoints, {failed} failed) into {args.output}")
+
+
+if __name__ == '__main__':
+    main()